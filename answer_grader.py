@@ -0,0 +1,134 @@
+import re
+
+# Share of the question's keyword concepts an answer must cover to be graded CORRECT without the AI
+CONFIDENT_CORRECT_COVERAGE = 0.75
+# Content words an answer needs besides the keywords to count as an explanation rather than a keyword list
+MIN_EXPLANATION_WORDS = 2
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "of", "to", "in", "on", "at", "for", "with", "by", "from",
+    "is", "are", "was", "were", "be", "been", "it", "its", "this", "that", "these", "those", "as",
+    "i", "you", "we", "they", "he", "she", "my", "your", "our", "their", "so", "do", "does", "can",
+    "will", "would", "could", "should", "about", "into", "than", "then", "there", "what", "which",
+    "who", "how", "why", "when", "yes", "think", "maybe", "just", "very", "really"
+}
+
+# Keyword coverage can't tell "X does Y" from "X does not do Y", so answers with these go to the AI
+_NEGATION_PATTERN = re.compile(r"\b(not|no|never|none|nothing|nobody|neither|nor|cannot|without)\b|n't\b")
+
+# Longest suffixes first. A suffix is only stripped if at least 3 letters remain.
+_SUFFIXES = ("ational", "ations", "ation", "ments", "ment", "ness", "ings", "ing", "ies", "ied",
+             "ers", "er", "ed", "es", "ly", "s")
+_SUFFIX_REPLACEMENTS = {"ational": "ate", "ies": "y", "ied": "y"}
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def stem(word):
+    """Crude suffix stripping, only used so the answer and the keywords reduce the same way."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)] + _SUFFIX_REPLACEMENTS.get(suffix, "")
+    return word
+
+
+def normalize(text):
+    """Lowercases text and returns its stemmed content words (stopwords and punctuation removed, negations kept)."""
+    return [stem(word) for word in _WORD_PATTERN.findall(str(text).lower()) if word not in STOPWORDS]
+
+
+def has_negation(text):
+    return bool(_NEGATION_PATTERN.search(str(text).lower()))
+
+
+def parse_keywords(answer_keywords):
+    """answer_keywords may be a list or a comma/semicolon separated string of concepts."""
+    if not answer_keywords:
+        return []
+    if isinstance(answer_keywords, str):
+        answer_keywords = re.split(r"[,;\n]", answer_keywords)
+    return [keyword.strip() for keyword in answer_keywords if str(keyword).strip()]
+
+
+class AnswerPreGrader:
+    """
+    Grades quiz answers locally by keyword coverage before they are sent to the AI.
+
+    Each concept in the question's answer_keywords counts as covered if all of its content words
+    (or those of one of its synonyms from the question's "synonyms" map) appear in the answer.
+    Clear cases get a verdict, borderline ones return verdict None and should go to the AI. Answers
+    with a negation, or that only list the keywords, are never graded CORRECT locally.
+    """
+    def __init__(self, confident_correct_coverage=CONFIDENT_CORRECT_COVERAGE, min_explanation_words=MIN_EXPLANATION_WORDS):
+        self.confident_correct_coverage = confident_correct_coverage
+        self.min_explanation_words = min_explanation_words
+
+        # Statistics
+        self.local_verdicts = 0
+        self.escalations = 0
+        self.audits = 0
+        self.audit_agreements = 0
+
+    def grade(self, question, answer):
+        """
+        Returns {"verdict": "CORRECT" / "INCORRECT" / None, "coverage": float, "matched": [...],
+        "missing": [...], "message": str}. A None verdict means the answer needs the AI.
+        """
+        answer_words = normalize(answer)
+        answer_word_set = set(answer_words)
+        concepts = parse_keywords(question.get("answer_keywords"))
+        synonyms = question.get("synonyms") or {}
+
+        matched = []
+        missing = []
+        keyword_words = set()
+        for concept in concepts:
+            alternatives = [concept] + list(synonyms.get(concept) or synonyms.get(concept.lower()) or [])
+            for alternative in alternatives:
+                keyword_words.update(normalize(alternative))
+            if any(self._covers(answer_word_set, alternative) for alternative in alternatives):
+                matched.append(concept)
+            else:
+                missing.append(concept)
+        coverage = len(matched) / len(concepts) if concepts else 0.0
+        is_keyword_list = len(answer_word_set - keyword_words) < self.min_explanation_words
+
+        result = {"verdict": None, "coverage": coverage, "matched": matched, "missing": missing, "message": ""}
+        if not answer_words:
+            # Only stopwords or punctuation, a terse answer with any content word goes to the AI instead
+            result["verdict"] = "INCORRECT"
+            result["message"] = "That answer doesn't say anything yet. Try explaining your idea in a full sentence."
+        elif concepts and coverage >= self.confident_correct_coverage and not is_keyword_list and not has_negation(answer):
+            result["verdict"] = "CORRECT"
+            result["message"] = f"Your answer covers the key ideas: {', '.join(matched)}."
+
+        if result["verdict"]:
+            self.local_verdicts += 1
+        else:
+            self.escalations += 1
+        return result
+
+    @staticmethod
+    def _covers(answer_word_set, phrase):
+        phrase_words = normalize(phrase)
+        return bool(phrase_words) and all(word in answer_word_set for word in phrase_words)
+
+    def record_audit(self, local_verdict, ai_response):
+        """Compares a local verdict with the AI's grading of the same answer."""
+        ai_verdict = "CORRECT" if ai_response.upper().strip().startswith("CORRECT") else "INCORRECT"
+        self.audits += 1
+        if ai_verdict == local_verdict:
+            self.audit_agreements += 1
+        else:
+            print(f"PreGrader: audit disagreement, local {local_verdict} vs AI {ai_verdict}")
+        self.print_stats()
+
+    def get_agreement_rate(self):
+        return self.audit_agreements / self.audits if self.audits else None
+
+    def print_stats(self):
+        total = self.local_verdicts + self.escalations
+        agreement = self.get_agreement_rate()
+        agreement_text = f"{agreement:.0%} of {self.audits} audits" if agreement is not None else "no audits yet"
+        print(f"PreGrader: saved {self.local_verdicts} of {total} AI calls, "
+              f"escalated {self.escalations}, agreement with AI: {agreement_text}")
@@ -0,0 +1,88 @@
+import threading
+import pygame
+
+
+class AssetManager:
+    """
+    Shared cache of image surfaces keyed by (path, size, flip, format).
+
+    Scaled and flipped variants are derived from the cached original, so every sprite asking for the
+    same variant gets the same Surface object. Returned surfaces are shared: copy() one before
+    drawing on it or changing its alpha.
+    """
+    def __init__(self):
+        self.surfaces = {}  # {(path, size, (flip_x, flip_y), image_format): Surface}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()  # Maps are preloaded on a background thread too
+
+    def get_image(self, path, size=None, flip_x=False, flip_y=False, image_format="alpha"):
+        """
+        Returns the image at path, optionally scaled to size (w, h) and flipped.
+        image_format is "alpha" (convert_alpha), "opaque" (convert) or "raw" (as loaded).
+        """
+        key = (path, tuple(size) if size else None, (flip_x, flip_y), image_format)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        with self._lock:
+            surface = self.surfaces.get(key)
+            if surface is not None:
+                self.hits += 1
+                return surface
+            self.misses += 1
+
+            if flip_x or flip_y:
+                surface = pygame.transform.flip(self.get_image(path, size, image_format=image_format), flip_x, flip_y)
+            elif size:
+                # Full-size originals are often much bigger than the sprite, only keep one if it was asked for itself
+                original = self.surfaces.get((path, None, (False, False), image_format)) or self._load(path, image_format)
+                surface = pygame.transform.scale(original, key[1])
+            else:
+                surface = self._load(path, image_format)
+            self.surfaces[key] = surface
+            return surface
+
+    @staticmethod
+    def _load(path, image_format):
+        surface = pygame.image.load(path)
+        if image_format == "alpha":
+            return surface.convert_alpha()
+        elif image_format == "opaque":
+            return surface.convert()
+        return surface
+
+    def evict(self, path=None):
+        """Drops every cached variant of path (or everything if path is None). Returns how many were dropped."""
+        with self._lock:
+            keys = [key for key in self.surfaces if path is None or key[0] == path]
+            for key in keys:
+                del self.surfaces[key]
+        return len(keys)
+
+    @staticmethod
+    def surface_bytes(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def get_memory_usage(self):
+        """Returns the total pixel memory of all cached surfaces in bytes."""
+        return sum(self.surface_bytes(surface) for surface in list(self.surfaces.values()))
+
+    def print_memory_report(self):
+        """Prints every cached surface with its size, largest first."""
+        entries = sorted(self.surfaces.items(), key=lambda item: self.surface_bytes(item[1]), reverse=True)
+        print(f"AssetManager: {len(entries)} surfaces, {self.get_memory_usage() / 1024:.1f} KiB "
+              f"({self.hits} hits, {self.misses} misses)")
+        for (path, size, flip, image_format), surface in entries:
+            print(f"  {path} size={size} flip={flip} format={image_format}: "
+                  f"{surface.get_width()}x{surface.get_height()}, {self.surface_bytes(surface) / 1024:.1f} KiB")
+
+
+# Shared instance used by every sprite and map
+assets = AssetManager()
+
+
+def get_image(path, size=None, flip_x=False, flip_y=False, image_format="alpha"):
+    return assets.get_image(path, size, flip_x, flip_y, image_format)
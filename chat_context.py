@@ -0,0 +1,108 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from llm_backend import get_backend
+from llm_cache import llm_cache
+
+# Estimated tokens of past turns sent with each message, older turns are folded into the summary
+DEFAULT_TOKEN_BUDGET = 1200
+SUMMARY_MODEL = "gemini-2.0-flash-lite"
+SUMMARY_PROMPT = """Summarize this conversation between a visitor and a wizard in at most 80 words. Keep what the visitor told about themselves, the topics discussed and any open questions.
+Summary so far: '{summary}'
+New part of the conversation:
+{turns}"""
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token), good enough for a budget."""
+    return len(text) // 4 + 1
+
+
+class ChatContext:
+    """
+    The part of a conversation that is sent to the model: a running summary plus the most recent turns.
+
+    Once the recent turns exceed token_budget, the oldest half of them is summarized on a background
+    worker and replaced by the new summary, so the history sent with each message stays about the same
+    size however long the conversation gets. Until the summary is ready those turns are still sent, and
+    if summarizing fails they are kept and folded again after the next turn.
+    """
+    def __init__(self, token_budget=DEFAULT_TOKEN_BUDGET, summarize_func=None):
+        self.token_budget = token_budget
+        self.summarize_func = summarize_func or self._summarize
+        self.summary = ""
+        self.turns = []  # [(player_message, wizard_reply), ...] not covered by the summary
+        self.generation = 0  # Bumped on reset so a summary of an old conversation is dropped
+        self.summarizing = False
+        self.summaries_made = 0
+        self._lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-summary")
+
+    def reset(self):
+        with self._lock:
+            self.generation += 1
+            self.summary = ""
+            self.turns = []
+            self.summarizing = False
+
+    def build_history(self):
+        """The history to give the chat session before sending the next message."""
+        with self._lock:
+            history = []
+            if self.summary:
+                history.append({"role": "user", "parts": [f"Summary of our conversation so far: {self.summary}"]})
+                history.append({"role": "model", "parts": ["I remember."]})
+            for player_message, wizard_reply in self.turns:
+                history.append({"role": "user", "parts": [player_message]})
+                history.append({"role": "model", "parts": [wizard_reply]})
+            return history
+
+    def _turn_tokens(self, turns):
+        return sum(estimate_tokens(player_message) + estimate_tokens(wizard_reply) for player_message, wizard_reply in turns)
+
+    def add_turn(self, player_message, wizard_reply, generation=None):
+        """
+        Records a finished turn and starts folding old turns into the summary once over budget.
+        generation is self.generation from when the message was sent, the turn is dropped if it changed.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.turns.append((player_message, wizard_reply))
+            if self.summarizing or self._turn_tokens(self.turns) <= self.token_budget or len(self.turns) < 2:
+                return
+            folded_turns = self.turns[:len(self.turns) // 2]
+            self.summarizing = True
+            generation = self.generation
+            summary = self.summary
+        self.executor.submit(self._fold_turns, summary, folded_turns, generation)
+
+    def _fold_turns(self, summary, folded_turns, generation):
+        try:
+            new_summary = self.summarize_func(summary, folded_turns)
+        except Exception as e:
+            print(f"ChatContext: summary failed, keeping the turns until the next try: {e}")
+            with self._lock:
+                if generation == self.generation:
+                    self.summarizing = False
+            return
+        with self._lock:
+            if generation != self.generation:
+                return  # The conversation was reset meanwhile
+            self.summary = new_summary
+            # New turns may have been added meanwhile, the folded ones are still at the front
+            self.turns = self.turns[len(folded_turns):]
+            self.summarizing = False
+            self.summaries_made += 1
+        print(f"ChatContext: folded {len(folded_turns)} turns into the summary ({estimate_tokens(new_summary)} tokens)")
+
+    @staticmethod
+    def _summarize(summary, turns):
+        turns_text = "\n".join(f"Visitor: {player_message}\nWizard: {wizard_reply}" for player_message, wizard_reply in turns)
+        prompt = SUMMARY_PROMPT.format(summary=summary or "nothing yet", turns=turns_text)
+        return llm_cache.call(SUMMARY_MODEL, None, prompt, lambda: get_backend().generate(SUMMARY_MODEL, prompt))
+
+    def get_stats(self):
+        with self._lock:
+            return {"summary_tokens": estimate_tokens(self.summary) if self.summary else 0,
+                    "recent_turns": len(self.turns), "recent_tokens": self._turn_tokens(self.turns),
+                    "summaries_made": self.summaries_made}
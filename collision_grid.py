@@ -0,0 +1,49 @@
+from tile_layer import TileLayer
+
+
+class CollisionGrid:
+    """
+    Dense, padded copy of a map's collision layer for fast walkability queries.
+
+    Cells are stored in one bytearray (0 = walkable, 1 = blocked) with a one-tile wall border
+    around the map, so lookups just past the edges need no bounds checks and read as blocked.
+    """
+    def __init__(self, collision_layout, tile_size):
+        layer = TileLayer.ensure(collision_layout, 1)
+        self.tile_size = tile_size
+        self.width = layer.width
+        self.height = layer.height
+        self.stride = self.width + 2
+
+        self.cells = bytearray(b'\x01') * (self.stride * (self.height + 2))
+        for row_idx in range(self.height):
+            start = (row_idx + 1) * self.stride + 1
+            self.cells[start:start + self.width] = bytes(0 if tile_id == 0 else 1 for tile_id in layer.row(row_idx))
+
+    def _clamp(self, tile_index, size):
+        # Anything further out than the border maps onto the border, which is always blocked
+        return min(max(tile_index, -1), size)
+
+    def is_walkable_at(self, world_x, world_y):
+        """Checks a single world-space point."""
+        col = self._clamp(int(world_x // self.tile_size), self.width)
+        row = self._clamp(int(world_y // self.tile_size), self.height)
+        return self.cells[(row + 1) * self.stride + col + 1] == 0
+
+    def footprint_blocked(self, x, y, w, h):
+        """Returns True if any tile covered by the world-space rectangle (x, y, w, h) is blocked."""
+        tile_size = self.tile_size
+        col_start = self._clamp(int(x // tile_size), self.width)
+        col_end = self._clamp(int((x + max(w, 1) - 1) // tile_size), self.width)
+        row_start = self._clamp(int(y // tile_size), self.height)
+        row_end = self._clamp(int((y + max(h, 1) - 1) // tile_size), self.height)
+
+        for row in range(row_start, row_end + 1):
+            row_offset = (row + 1) * self.stride + 1
+            if self.cells.find(1, row_offset + col_start, row_offset + col_end + 1) != -1:
+                return True
+        return False
+
+    def rect_walkable(self, rect):
+        """Returns True if every tile under the pygame.Rect is walkable."""
+        return not self.footprint_blocked(rect.x, rect.y, rect.width, rect.height)
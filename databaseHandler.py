@@ -1,15 +1,30 @@
-import firebase_admin
-from firebase_admin import credentials
-from firebase_admin import firestore
 import os
 import random
+import threading
 
 SERVICE_ACCOUNT_KEY_PATH = os.path.join(os.path.dirname(__file__), 'hackathon2025db.json')
 
+# firebase_admin takes long to import, so it is only imported when the first FirestoreHandler is created
+firebase_admin = None
+credentials = None
+firestore = None
+
+
+def _import_firebase():
+    global firebase_admin, credentials, firestore
+    if firebase_admin is None:
+        import firebase_admin as firebase_admin_module
+        from firebase_admin import credentials as credentials_module
+        from firebase_admin import firestore as firestore_module
+        credentials, firestore = credentials_module, firestore_module
+        firebase_admin = firebase_admin_module
+
+
 class FirestoreHandler:
     def __init__(self, service_account_key_path):
         self.db = None
         try:
+            _import_firebase()
             cred = credentials.Certificate(service_account_key_path)
             # Check if the app is already initialized to prevent re-initialization error
             if not firebase_admin._apps:
@@ -59,6 +74,31 @@ class FirestoreHandler:
             print(f"Error reading from Firestore: {e}")
             return None
 
+    def update_document(self, collection_name, document_id, fields):
+        """Updates several fields of an existing document in one write, leaving the others untouched."""
+        if not self.db:
+            print("Firestore client not available. Cannot update document.")
+            return False
+        try:
+            doc_ref = self.db.collection(collection_name).document(document_id)
+            doc_ref.update(fields)
+            print(f"Successfully updated {', '.join(fields)} in '{document_id}'.")
+            return True
+        except Exception as e:
+            print(f"Error updating document: {e}")
+            return False
+
+    def list_document_ids(self, collection_name):
+        """Lists the IDs of all documents in a collection without reading their data."""
+        if not self.db:
+            print("Firestore client not available. Cannot list documents.")
+            return []
+        try:
+            return [doc_ref.id for doc_ref in self.db.collection(collection_name).list_documents()]
+        except Exception as e:
+            print(f"Error listing documents in '{collection_name}': {e}")
+            return []
+
     def get_specific_field(self, collection_name, document_id, field_name):
         """Gets a specific field from a Firestore document."""
         if not self.db:
@@ -242,14 +282,37 @@ class FirestoreHandler:
             print(f"Error adding unlocked quote: {e}")
             return False
 
+_shared_handler = None
+_shared_handler_failed = False
+_shared_handler_lock = threading.Lock()
+
+
+def get_firestore_handler():
+    """
+    The FirestoreHandler shared by the whole game, connected on first use. Returns None if connecting
+    failed, without trying again.
+    """
+    global _shared_handler, _shared_handler_failed
+    with _shared_handler_lock:
+        if _shared_handler is None and not _shared_handler_failed:
+            try:
+                _shared_handler = FirestoreHandler(SERVICE_ACCOUNT_KEY_PATH)
+            except Exception as e:
+                print(f"Failed to initialize the database handler: {e}")
+                _shared_handler_failed = True
+        return _shared_handler
+
+
+def warm_up():
+    """Connects the shared handler on a background thread, so the first database call doesn't wait for it."""
+    threading.Thread(target=get_firestore_handler, name="firestore-warm-up", daemon=True).start()
+
+
 class DatabaseHandler:
     """Wrapper class to provide interface for quiz system"""
-    def __init__(self):
-        try:
-            self.firestore_handler = FirestoreHandler(SERVICE_ACCOUNT_KEY_PATH)
-        except Exception as e:
-            print(f"Failed to initialize DatabaseHandler: {e}")
-            self.firestore_handler = None
+    @property
+    def firestore_handler(self):
+        return get_firestore_handler()
     
     def read_document(self, collection_name, document_id):
         """Read a document from the database"""
@@ -257,6 +320,12 @@ class DatabaseHandler:
             return self.firestore_handler.read_document(collection_name, document_id)
         return None
 
+    def list_document_ids(self, collection_name):
+        """List the IDs of all documents in a collection"""
+        if self.firestore_handler:
+            return self.firestore_handler.list_document_ids(collection_name)
+        return []
+
     def get_user_unlocked_quotes(self, username):
         """Gets the unlocked quotes list for a specific user."""
         if self.firestore_handler:
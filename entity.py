@@ -1,9 +1,11 @@
 import pygame
+from asset_manager import get_image
 
 class Entity(pygame.sprite.Sprite):
-    def __init__(self, x, y, image_path):
+    def __init__(self, x, y, image_path, size=None):
         super().__init__()
-        self.image = pygame.image.load(image_path).convert_alpha()
+        # Shared with every other sprite using the same image, don't draw onto it
+        self.image = get_image(image_path, size)
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
@@ -0,0 +1,138 @@
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from databaseHandler import FirestoreHandler, SERVICE_ACCOUNT_KEY_PATH
+from question_bank import QUESTION_COLLECTION
+from llm_backend import get_backend, BackendUnavailableError
+
+HINT_MODEL = "gemini-2.0-flash"
+HINT_COUNT = 3
+# Requests in flight at once, kept low to stay under the API's rate limits
+DEFAULT_CONCURRENCY = 4
+MAX_RETRIES = 3
+
+HINT_PROMPT = """You are preparing an AI knowledge quiz for a game. For the question below, write:
+- "hints": exactly {hint_count} hints as a ladder. The first is a gentle nudge, each next one is more specific, and the last one points straight at the missing idea. No hint may state the full answer.
+- "rubric": an object with "key_points" (the ideas a correct answer must contain), "correct_if" (one sentence describing when an answer counts as correct) and "common_mistakes" (a list of typical wrong or incomplete answers).
+Keep every hint under 30 words and the language simple.
+Question: '{question_text}'
+Expected Concepts: '{answer_keywords}'
+Respond with only the JSON object, no other text."""
+
+
+def build_prompt(question):
+    return HINT_PROMPT.format(hint_count=HINT_COUNT,
+                              question_text=question.get('question_text', ''),
+                              answer_keywords=question.get('answer_keywords', ''))
+
+
+def parse_hint_response(text):
+    """Returns (hints, rubric) from the model's JSON reply, raising ValueError if it is unusable."""
+    text = text.strip()
+    if text.startswith("```"):
+        # Strip a ```json ... ``` fence
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    data = json.loads(text)
+
+    hints = [str(hint).strip() for hint in data.get("hints", []) if str(hint).strip()]
+    rubric = data.get("rubric")
+    if len(hints) != HINT_COUNT:
+        raise ValueError(f"expected {HINT_COUNT} hints, got {len(hints)}")
+    if not isinstance(rubric, dict) or not rubric.get("key_points"):
+        raise ValueError("rubric is missing its key points")
+    return hints, rubric
+
+
+def get_hint_backend():
+    """
+    The gemini backend. The hints are stored for good, so the local stand-in's canned replies must never be used.
+    It bypasses the game's rate limiter and circuit breaker, --concurrency and the retries pace this script instead.
+    """
+    backend = get_backend(guarded=False)
+    if backend.name != "gemini":
+        raise BackendUnavailableError(f"hints can only be generated with the gemini backend, not '{backend.name}'")
+    return backend
+
+
+def generate_hints(question, model_name=HINT_MODEL):
+    """
+    Asks the model for the question's hint ladder and rubric, retrying with backoff on errors.
+    Returns (hints, rubric, producer), producer being the "backend/model" that wrote them.
+    """
+    backend = get_hint_backend()
+    prompt = build_prompt(question)
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            hints, rubric = parse_hint_response(backend.generate(model_name, prompt))
+            return hints, rubric, f"{backend.name}/{model_name}"
+        except Exception as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = 2 ** attempt
+            print(f"  retrying in {delay}s after: {e}")
+            time.sleep(delay)
+
+
+def process_question(db_handler, collection_name, question_id, model_name, force, dry_run):
+    """Generates and writes back the hints of one question. Returns 'written', 'skipped' or 'failed'."""
+    question = db_handler.read_document(collection_name, question_id)
+    if not question:
+        return "failed"
+    if question.get("hints") and question.get("rubric") and not force:
+        return "skipped"
+
+    try:
+        hints, rubric, producer = generate_hints(question, model_name)
+    except Exception as e:
+        print(f"Question {question_id}: could not generate hints: {e}")
+        return "failed"
+
+    print(f"Question {question_id}: {question.get('question_text', '')}")
+    for number, hint in enumerate(hints, 1):
+        print(f"  hint {number}: {hint}")
+    if dry_run:
+        return "written"
+
+    fields = {"hints": hints, "rubric": rubric, "hints_model": producer}
+    return "written" if db_handler.update_document(collection_name, question_id, fields) else "failed"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generates a hint ladder and a grading rubric for every quiz question.")
+    parser.add_argument("--collection", default=QUESTION_COLLECTION)
+    parser.add_argument("--model", default=HINT_MODEL)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="requests in flight at once")
+    parser.add_argument("--force", action="store_true", help="regenerate questions that already have hints")
+    parser.add_argument("--dry-run", action="store_true", help="print the hints without writing them back")
+    parser.add_argument("question_ids", nargs="*", help="only these questions (default: the whole collection)")
+    args = parser.parse_args()
+
+    try:
+        get_hint_backend()
+    except BackendUnavailableError as e:
+        print(f"Not generating hints: {e}")
+        return
+
+    db_handler = FirestoreHandler(SERVICE_ACCOUNT_KEY_PATH)
+    question_ids = args.question_ids or db_handler.list_document_ids(args.collection)
+    print(f"Generating hints for {len(question_ids)} questions in '{args.collection}' "
+          f"with {args.model}, {args.concurrency} at a time")
+
+    start = time.perf_counter()
+    results = {"written": 0, "skipped": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        futures = [executor.submit(process_question, db_handler, args.collection, question_id,
+                                   args.model, args.force, args.dry_run)
+                   for question_id in question_ids]
+        for future in as_completed(futures):
+            results[future.result()] += 1
+
+    print(f"\nDone in {time.perf_counter() - start:.1f}s: {results['written']} written, "
+          f"{results['skipped']} already had hints, {results['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()
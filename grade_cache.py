@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from llm_backend import get_backend_name
+
+GRADE_CACHE_PATH = os.path.join(os.path.dirname(__file__), "quiz_grade_cache.json")
+MAX_CACHED_GRADES = 2000
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def canonical_answer(text):
+    """
+    The answer lowercased with punctuation and whitespace collapsed. Unlike the pre-grader's normalization
+    no word is dropped, so "do not learn" and "learn" are cached separately.
+    """
+    return " ".join(_WORD_PATTERN.findall(str(text).lower()))
+
+
+class GradeCache:
+    """
+    AI grading results keyed by (model backend, question id, hash of the canonical answer).
+
+    Kept in memory as an LRU and written to a local JSON file, so an answer graded once is graded
+    instantly on later retries and in later sessions.
+    """
+    def __init__(self, path=GRADE_CACHE_PATH, max_entries=MAX_CACHED_GRADES):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # {key: {"verdict": str, "response": str}}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @staticmethod
+    def make_key(question_id, answer):
+        answer_hash = hashlib.sha1(canonical_answer(answer).encode("utf-8")).hexdigest()
+        return f"{get_backend_name()}:{question_id}:{answer_hash}"
+
+    def get(self, question_id, answer):
+        """Returns the cached AI response text for this answer, or None."""
+        key = self.make_key(question_id, answer)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry["response"]
+
+    def put(self, question_id, answer, ai_response):
+        key = self.make_key(question_id, answer)
+        verdict = "CORRECT" if ai_response.upper().strip().startswith("CORRECT") else "INCORRECT"
+        self.entries[key] = {"verdict": verdict, "response": ai_response}
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self._save()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                self.entries = OrderedDict(json.load(cache_file))
+            print(f"GradeCache: loaded {len(self.entries)} graded answers from {self.path}")
+        except (OSError, ValueError) as e:
+            print(f"GradeCache: could not read {self.path}, starting empty: {e}")
+            self.entries = OrderedDict()
+
+    def _save(self):
+        # Write to a temporary file first so a crash never leaves a half-written cache behind
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(list(self.entries.items()), cache_file)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"GradeCache: could not write {self.path}: {e}")
@@ -8,6 +8,12 @@ class InteractionManager:
         # Stores {interactable_id: has_interacted_bool}
         self.interacted_flags = {}
         self.current_eligible_interactable = None
+        # Callbacks called with the new eligible interactable (or None) whenever it changes
+        self.eligibility_listeners = []
+
+    def add_eligibility_listener(self, callback):
+        """Registers callback(interactable_or_None), called when the eligible interactable changes."""
+        self.eligibility_listeners.append(callback)
 
     def add_interactable(self, interactable_obj):
         """Adds an interactable object to the manager."""
@@ -32,6 +38,7 @@ class InteractionManager:
         Determines which interactable (if any) is currently eligible for a popup.
         Resets interaction flags if player moves sufficiently far away after an interaction.
         """
+        previous_eligible = self.current_eligible_interactable
         self.current_eligible_interactable = None
         player_pos = pygame.math.Vector2(player_rect_center)
 
@@ -51,6 +58,10 @@ class InteractionManager:
                     self.interacted_flags[props['id']] = False
                     # print(f"Interaction for {props['id']} has been reset.")
 
+        if self.current_eligible_interactable is not previous_eligible:
+            for callback in self.eligibility_listeners:
+                callback(self.current_eligible_interactable)
+
     def get_eligible_interactable(self):
         """Returns the interactable object that is currently eligible for interaction popup."""
         return self.current_eligible_interactable
@@ -0,0 +1,315 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from dotenv import load_dotenv
+from llm_guard import ModelGuard, GuardedBackend
+
+load_dotenv()
+
+# gemini: the Google APIs (needs GOOGLE_API_KEY). local: the offline stand-in below, for tests and
+# benchmarks only, so it is never used unless LLM_BACKEND=local is set.
+LLM_BACKENDS = ("gemini", "local")
+
+# Cheap call the circuit breaker uses to check whether the API has recovered
+PROBE_MODEL = "gemini-2.0-flash-lite"
+PROBE_PROMPT = "Reply with OK."
+
+# Used by the local stand-in when no script rule matches the prompt
+DEFAULT_LOCAL_SCRIPT = [
+    {"match": "Respond with only the JSON object",
+     "response": '{"hints": ["Think about what the question is really asking.", "Which key idea from the lesson fits here?", "Focus on the main concept behind the question."], '
+                 '"rubric": {"key_points": ["the main concept"], "correct_if": "The answer explains the main concept.", "common_mistakes": ["Answering too vaguely"]}}'},
+    {"match": "Evaluate if the player's answer",
+     "response": "INCORRECT. The answer is missing some of the key ideas, try to explain the main concept in more detail."},
+    {"match": "Summarize this conversation",
+     "response": "The visitor and the wizard talked about AI, the future and what it means to be human."},
+    {"match": "Ask me one",
+     "response": "If an AI could remember everything you ever told it, what would you still keep to yourself?"},
+]
+
+
+class BackendError(Exception):
+    """Raised when a model call fails (including errors injected by the local stand-in)."""
+
+
+class BackendUnavailableError(BackendError):
+    """Raised by get_backend() when there is no API key, which turns the model features off."""
+
+
+class ModelBackend:
+    """
+    Interface of the model backends.
+
+    generate() returns the text of a single prompt's response. start_chat() returns a chat session with
+    send_message(message, stream=False), whose result has .text (or is an iterable of chunks with .text when
+    streaming), and a history list of messages with .role and .parts, which can be assigned.
+    """
+    name = None
+
+    def generate(self, model_name, contents):
+        raise NotImplementedError
+
+    def start_chat(self, model_name, system_instruction):
+        raise NotImplementedError
+
+    def list_models(self):
+        return []
+
+    def warm_up(self):
+        """Starts loading whatever the first call would otherwise wait for, without blocking."""
+
+
+class LazyChatSession:
+    """Creates the real chat session on first use, so starting a chat doesn't import the SDK."""
+    def __init__(self, create_session):
+        self._create_session = create_session
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _get_session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
+
+    @property
+    def history(self):
+        return self._get_session().history
+
+    @history.setter
+    def history(self, messages):
+        self._get_session().history = messages
+
+    def send_message(self, message, stream=False):
+        return self._get_session().send_message(message, stream=stream)
+
+
+class GeminiBackend(ModelBackend):
+    """The Google APIs. The SDKs are only imported when the first call needs them (or by warm_up())."""
+    name = "gemini"
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self._client = None
+        self._configured = False
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                from google import genai
+                self._client = genai.Client(api_key=self.api_key)
+            return self._client
+
+    def generate(self, model_name, contents):
+        return self._get_client().models.generate_content(model=model_name, contents=contents).text
+
+    def start_chat(self, model_name, system_instruction):
+        return LazyChatSession(lambda: self._start_chat_now(model_name, system_instruction))
+
+    def _start_chat_now(self, model_name, system_instruction):
+        import google.generativeai as genai
+        with self._lock:
+            if not self._configured:
+                genai.configure(api_key=self.api_key)
+                self._configured = True
+        model = genai.GenerativeModel(model_name=model_name, system_instruction=system_instruction)
+        return model.start_chat(history=[])
+
+    def list_models(self):
+        return [model.name for model in self._get_client().models.list()]
+
+    def warm_up(self):
+        def import_sdks():
+            try:
+                import google.generativeai  # Only loaded here, the chat sessions import it again when created
+                self._get_client()
+                print("GeminiBackend: SDKs loaded")
+            except Exception as e:
+                print(f"GeminiBackend: could not load the SDKs: {e}")
+        threading.Thread(target=import_sdks, name="gemini-warm-up", daemon=True).start()
+
+
+class LocalMessage:
+    def __init__(self, role, text):
+        self.role = role
+        self.parts = [LocalText(text)]
+
+
+class LocalText:
+    def __init__(self, text):
+        self.text = text
+
+
+class LocalChatSession:
+    """Chat session of the local stand-in. Like the SDK's, a turn joins the history once its reply is fully read."""
+    def __init__(self, backend, model_name, system_instruction):
+        self.backend = backend
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self._history = []
+
+    @property
+    def history(self):
+        return self._history
+
+    @history.setter
+    def history(self, messages):
+        self._history = [message if hasattr(message, "parts") else
+                         LocalMessage(message["role"], "".join(str(part) for part in message["parts"]))
+                         for message in messages]
+
+    def send_message(self, message, stream=False):
+        if not stream:
+            reply = self.backend.generate(self.model_name, message)
+            self._record_turn(message, reply)
+            return LocalText(reply)
+        return self._stream(message)
+
+    def _stream(self, message):
+        chunks = []
+        for chunk in self.backend.stream(self.model_name, message):
+            chunks.append(chunk.text)
+            yield chunk
+        self._record_turn(message, "".join(chunks))
+
+    def _record_turn(self, message, reply):
+        self._history.extend([LocalMessage("user", message), LocalMessage("model", reply)])
+
+
+class LocalBackend(ModelBackend):
+    """
+    Offline stand-in for load tests and benchmarks, configured with LLM_LOCAL_* environment variables.
+
+    Responses come from script rules ({"match": regex, "response": text}, first match wins), or are made up
+    deterministically from the prompt. Latency is drawn from a fixed, uniform or lognormal distribution,
+    streamed replies arrive word by word, and a share of calls can be made to fail.
+    """
+    name = "local"
+
+    def __init__(self, script=None, latency="lognormal:0.8,0.5", token_delay=0.03, error_rate=0.0, seed=0):
+        self.script = list(script or []) + DEFAULT_LOCAL_SCRIPT
+        self.latency = self._parse_latency(latency)
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()  # random.Random isn't shared safely between the worker threads
+        self.calls = 0
+        self.injected_errors = 0
+
+    @staticmethod
+    def _parse_latency(latency):
+        """'fixed:S', 'uniform:LOW,HIGH' or 'lognormal:MEDIAN,SIGMA', all in seconds."""
+        distribution, _, params = latency.partition(":")
+        values = [float(value) for value in params.split(",") if value]
+        if distribution not in ("fixed", "uniform", "lognormal") or not values:
+            raise ValueError(f"unknown latency distribution '{latency}'")
+        return distribution, values
+
+    def _draw_latency(self):
+        distribution, values = self.latency
+        with self._lock:
+            if distribution == "fixed":
+                return values[0]
+            if distribution == "uniform":
+                return self.random.uniform(values[0], values[1])
+            median, sigma = values[0], values[1] if len(values) > 1 else 0.5
+            return self.random.lognormvariate(0, sigma) * median
+
+    def _start_call(self, model_name):
+        """Counts the call, waits out its latency and raises if an error is injected."""
+        with self._lock:
+            self.calls += 1
+            fail = self.random.random() < self.error_rate
+            if fail:
+                self.injected_errors += 1
+        time.sleep(self._draw_latency())
+        if fail:
+            raise BackendError(f"local stand-in: injected error for {model_name}")
+
+    def _respond(self, contents):
+        prompt = contents if isinstance(contents, str) else json.dumps(contents, default=str)
+        for rule in self.script:
+            if re.search(rule["match"], prompt, re.IGNORECASE):
+                return rule["response"]
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        return f"(local reply {digest}) That is a fine question. What do you think the answer is?"
+
+    def generate(self, model_name, contents):
+        self._start_call(model_name)
+        return self._respond(contents)
+
+    def stream(self, model_name, contents):
+        """Yields the response word by word, token_delay seconds apart."""
+        self._start_call(model_name)
+        for word in re.findall(r"\S+\s*", self._respond(contents)):
+            time.sleep(self.token_delay)
+            yield LocalText(word)
+
+    def start_chat(self, model_name, system_instruction):
+        return LocalChatSession(self, model_name, system_instruction)
+
+    def list_models(self):
+        return ["local-stand-in"]
+
+    @classmethod
+    def from_environment(cls):
+        script = []
+        script_path = os.getenv("LLM_LOCAL_SCRIPT")
+        if script_path:
+            with open(script_path, "r", encoding="utf-8") as script_file:
+                script = json.load(script_file)
+        return cls(script=script,
+                   latency=os.getenv("LLM_LOCAL_LATENCY", "lognormal:0.8,0.5"),
+                   token_delay=float(os.getenv("LLM_LOCAL_TOKEN_DELAY", "0.03")),
+                   error_rate=float(os.getenv("LLM_LOCAL_ERROR_RATE", "0")),
+                   seed=int(os.getenv("LLM_LOCAL_SEED", "0")))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _configured_backend_name():
+    backend_name = os.getenv("LLM_BACKEND", "gemini").lower()
+    return backend_name if backend_name in LLM_BACKENDS else "gemini"
+
+
+def get_backend_name():
+    """Name of the backend that answers model calls, part of the cache keys so its responses are kept apart."""
+    with _backend_lock:
+        return _backend.name if _backend is not None else _configured_backend_name()
+
+
+def get_backend(guarded=True):
+    """
+    The shared backend chosen by LLM_BACKEND (gemini by default), behind the shared rate limiter and circuit
+    breaker. Raises BackendUnavailableError if gemini is chosen but there is no API key.
+    guarded=False returns the backend without the guard, for offline scripts that pace their own requests.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            backend_name = os.getenv("LLM_BACKEND", "gemini").lower()
+            if backend_name not in LLM_BACKENDS:
+                print(f"LLM backend: unknown backend '{backend_name}', using gemini")
+                backend_name = "gemini"
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if backend_name == "gemini" and not api_key:
+                raise BackendUnavailableError("GOOGLE_API_KEY not found in .env file or environment, AI features are disabled")
+            backend = GeminiBackend(api_key) if backend_name == "gemini" else LocalBackend.from_environment()
+            # The probe bypasses the guard, it runs exactly while the guard is rejecting calls
+            _backend = GuardedBackend(backend, ModelGuard(lambda: backend.generate(PROBE_MODEL, PROBE_PROMPT)))
+            print(f"LLM backend: {_backend.name}")
+        return _backend if guarded else _backend.backend
+
+
+def set_backend(backend):
+    """Replaces the shared backend (for benchmarks that build their own LocalBackend), behind a new guard."""
+    global _backend
+    with _backend_lock:
+        _backend = GuardedBackend(backend, ModelGuard(lambda: backend.generate(PROBE_MODEL, PROBE_PROMPT)))
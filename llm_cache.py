@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dotenv import load_dotenv
+from llm_guard import GuardRejectedError
+from llm_backend import get_backend_name
+
+load_dotenv()
+
+LLM_CACHE_PATH = os.path.join(os.path.dirname(__file__), "llm_cache.sqlite3")
+# Stored response text before the least recently used responses are evicted
+MAX_CACHE_BYTES = 20 * 1024 * 1024
+# off: always call the API. cache: serve stored responses, store new ones. record: always call the API
+# and store the response. replay: serve stored responses only, never call the API.
+LLM_CACHE_MODES = ("off", "cache", "record", "replay")
+
+
+class ReplayMissError(Exception):
+    """Raised in replay mode when a call has no recorded response."""
+
+
+def history_to_contents(history):
+    """Plain [(role, text), ...] form of a chat session's history, for hashing."""
+    contents = []
+    for message in history:
+        parts = message.parts if hasattr(message, "parts") else message.get("parts", [])
+        role = message.role if hasattr(message, "role") else message.get("role")
+        contents.append((role, "".join(part.text if hasattr(part, "text") else str(part) for part in parts)))
+    return contents
+
+
+class LLMCache:
+    """
+    Content-addressed store of model responses in a local SQLite file.
+
+    Keys are a hash of (backend, model, system instruction, contents), where contents is the prompt or, for
+    chat turns, the history plus the new message. The mode comes from the LLM_CACHE_MODE environment variable.
+    Calls made with reuse=False (prompts meant to give a new answer each time) are recorded in cache mode
+    but only served back in replay mode, or while the model guard is rejecting calls.
+    """
+    def __init__(self, path=LLM_CACHE_PATH, max_bytes=MAX_CACHE_BYTES, mode=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.mode = (mode or os.getenv("LLM_CACHE_MODE", "off")).lower()
+        if self.mode not in LLM_CACHE_MODES:
+            print(f"LLMCache: unknown mode '{self.mode}', using 'off'")
+            self.mode = "off"
+        self._connection = None  # Opened on first use, never when the cache is off
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model, system_instruction, contents):
+        payload = json.dumps([get_backend_name(), model, system_instruction, contents], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connect(self):
+        if self._connection is None:
+            # Shared by the worker threads, every access holds self._lock
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, model TEXT, response TEXT, "
+                "size INTEGER, created REAL, last_used REAL)")
+            self._connection.commit()
+            print(f"LLMCache: {self.mode} mode, using {self.path}")
+        return self._connection
+
+    def get(self, key):
+        """Returns the stored response text for key, or None."""
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            connection.commit()
+            return row[0]
+
+    def put(self, key, model, response):
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, model, response, size, now, now))
+            self._evict_locked(connection)
+            connection.commit()
+
+    def _evict_locked(self, connection):
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used responses until 90% of the budget is left, so eviction doesn't run on every put
+        for key, size in connection.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            if total <= self.max_bytes * 0.9:
+                break
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def call(self, model, system_instruction, contents, generate, reuse=True, answered_by=None):
+        """
+        Returns generate()'s response text for this request, going through the cache according to the mode.
+        When another model may answer instead (a hedged call), answered_by() returns the model that produced
+        the fresh response, and it is stored under that model's key.
+        """
+        if self.mode == "off":
+            return generate()
+        key = self.make_key(model, system_instruction, contents)
+        looked_up = self.mode == "replay" or (self.mode == "cache" and reuse)
+        if looked_up:
+            response = self.get(key)
+            if response is not None:
+                return response
+            if self.mode == "replay":
+                raise ReplayMissError(f"no recorded response for this {model} request")
+        try:
+            response = generate()
+        except GuardRejectedError:
+            # The API is paused, so an earlier response to the same request beats none
+            response = None if looked_up else self.get(key)
+            if response is None:
+                raise
+            print("LLMCache: model calls are paused, serving a recorded response")
+            return response
+        if response:
+            answering_model = answered_by() if answered_by else model
+            if answering_model != model:
+                key = self.make_key(answering_model, system_instruction, contents)
+            self.put(key, answering_model, response)
+        return response
+
+    def stream(self, model, system_instruction, contents, generate_chunks, reuse=True):
+        """
+        Like call() for streamed responses: yields the chunks of generate_chunks(), or a stored response as a
+        single chunk. The response is only stored once the stream has been read to the end.
+        """
+        if self.mode == "off":
+            yield from generate_chunks()
+            return
+        key = self.make_key(model, system_instruction, contents)
+        if self.mode == "replay" or (self.mode == "cache" and reuse):
+            response = self.get(key)
+            if response is not None:
+                yield response
+                return
+            if self.mode == "replay":
+                raise ReplayMissError(f"no recorded response for this {model} request")
+        chunks = []
+        for chunk in generate_chunks():
+            chunks.append(chunk)
+            yield chunk
+        if chunks:
+            self.put(key, model, "".join(chunks))
+
+    def get_stats(self):
+        stats = {"mode": self.mode, "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+        if self.mode != "off":
+            with self._lock:
+                count, total = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            stats.update({"entries": count, "bytes": total})
+        return stats
+
+
+# Shared instance for all model calls
+llm_cache = LLMCache()
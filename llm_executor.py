@@ -0,0 +1,130 @@
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Requests running at once, the rest wait in the queue
+DEFAULT_MAX_WORKERS = 2
+# Seconds before a request's callback gets None instead of waiting any longer
+DEFAULT_TIMEOUT_SECONDS = 15
+
+
+class LLMExecutor:
+    """
+    Bounded worker pool for model calls made on behalf of NPC interactions.
+
+    submit() returns a request ID. Each request's callback is called exactly once, on a worker (or the
+    watchdog) thread, with the call's result, or with None if the call failed or timed out. A cancelled
+    request's callback is never called. Results that arrive after a timeout or cancel are dropped.
+    A timed out call can't be interrupted, so it keeps its worker busy until the API returns.
+    """
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, default_timeout=DEFAULT_TIMEOUT_SECONDS, name="llm"):
+        self.default_timeout = default_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.requests = {}  # {request_id: {"future", "callback", "running"}} until the callback is due
+        self._deadlines = []  # Heap of (deadline, request_id)
+        self._next_request_id = 1
+        self._wakeup = threading.Condition()
+        self._watchdog = None
+
+        # Metrics
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.timed_out = 0
+        self.stale_results = 0
+
+    def submit(self, func, callback, timeout=None):
+        """Runs func() on the pool and passes its result to callback. Returns the request ID."""
+        with self._wakeup:
+            request_id = self._next_request_id
+            self._next_request_id += 1
+            self.queued += 1
+            request = {"future": None, "callback": callback, "running": False}
+            self.requests[request_id] = request
+            request["future"] = self.executor.submit(self._run, request_id, func)
+            heapq.heappush(self._deadlines, (time.monotonic() + (timeout or self.default_timeout), request_id))
+            if self._watchdog is None:
+                self._watchdog = threading.Thread(target=self._watch, name="llm-watchdog")
+                self._watchdog.daemon = True
+                self._watchdog.start()
+            self._wakeup.notify()
+        return request_id
+
+    def cancel(self, request_id):
+        """Drops a request: a queued one never runs, a running one's result is ignored."""
+        with self._wakeup:
+            request = self.requests.pop(request_id, None)
+            if request is None:
+                return False
+            self.cancelled += 1
+            self._forget(request)
+            return True
+
+    def _forget(self, request):
+        # A queued call that can still be cancelled never reaches _run, so it leaves the queue here
+        if not request["running"] and request["future"].cancel():
+            self.queued -= 1
+
+    def _run(self, request_id, func):
+        with self._wakeup:
+            self.queued -= 1
+            request = self.requests.get(request_id)
+            if request is None:
+                return  # Cancelled or timed out while waiting
+            request["running"] = True
+            self.in_flight += 1
+
+        result = None
+        try:
+            result = func()
+        except Exception as e:
+            print(f"LLMExecutor: request {request_id} failed: {e}")
+            with self._wakeup:
+                self.failed += 1
+
+        with self._wakeup:
+            self.in_flight -= 1
+            request = self.requests.pop(request_id, None)
+            if request is None:
+                self.stale_results += 1
+                print(f"LLMExecutor: dropped the late result of request {request_id}")
+                return
+            self.completed += 1
+        request["callback"](result)
+
+    def _watch(self):
+        while True:
+            expired = []
+            with self._wakeup:
+                now = time.monotonic()
+                while self._deadlines and self._deadlines[0][0] <= now:
+                    _, request_id = heapq.heappop(self._deadlines)
+                    request = self.requests.pop(request_id, None)
+                    if request is not None:
+                        self.timed_out += 1
+                        self._forget(request)
+                        expired.append((request_id, request))
+                if not expired:
+                    self._wakeup.wait(self._deadlines[0][0] - now if self._deadlines else None)
+                    continue
+            for request_id, request in expired:
+                print(f"LLMExecutor: request {request_id} timed out")
+                request["callback"](None)
+
+    def get_metrics(self):
+        with self._wakeup:
+            return {
+                "queued": self.queued,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "timed_out": self.timed_out,
+                "stale_results": self.stale_results
+            }
+
+    def print_metrics(self):
+        print(f"LLMExecutor: {self.get_metrics()}")
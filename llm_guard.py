@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+
+# Sustained request rate and burst size shared by every model call
+DEFAULT_REQUESTS_PER_MINUTE = 30
+DEFAULT_BURST = 5
+# Longest a call waits for a rate limiter token before giving up
+MAX_TOKEN_WAIT_SECONDS = 5
+# Consecutive failures that open the circuit, and the first wait before probing for recovery
+FAILURE_THRESHOLD = 3
+PROBE_DELAY_SECONDS = 15
+MAX_PROBE_DELAY_SECONDS = 300
+
+
+class GuardRejectedError(Exception):
+    """Raised instead of calling the model when the guard won't let a call through."""
+
+
+class CircuitOpenError(GuardRejectedError):
+    """The model API failed repeatedly and is not called until a background probe succeeds."""
+
+
+class RateLimitedError(GuardRejectedError):
+    """No rate limiter token became free in time."""
+
+
+class TokenBucket:
+    """Allows `rate` calls per second on average, with bursts of up to `capacity` calls."""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """Takes a token if there is one, otherwise returns the seconds until the next one."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, timeout):
+        """Waits up to timeout seconds for a token. Returns False if none became free."""
+        give_up_at = time.monotonic() + timeout
+        while True:
+            wait_time = self._take()
+            if wait_time == 0:
+                return True
+            if time.monotonic() + wait_time > give_up_at:
+                return False
+            time.sleep(wait_time)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures. While open, calls fail fast and a background thread
+    probes the API with backoff, closing the circuit again on the first successful probe.
+    """
+    def __init__(self, probe_func, failure_threshold=FAILURE_THRESHOLD, probe_delay=PROBE_DELAY_SECONDS):
+        self.probe_func = probe_func
+        self.failure_threshold = failure_threshold
+        self.probe_delay = probe_delay
+        self.is_open = False
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.is_open or self.consecutive_failures < self.failure_threshold:
+                return
+            self.is_open = True
+            self.times_opened += 1
+        print(f"CircuitBreaker: {self.consecutive_failures} failures in a row, pausing model calls")
+        probe_thread = threading.Thread(target=self._probe_until_recovered, name="llm-probe")
+        probe_thread.daemon = True
+        probe_thread.start()
+
+    def _probe_until_recovered(self):
+        delay = self.probe_delay
+        while True:
+            time.sleep(delay)
+            try:
+                self.probe_func()
+            except Exception as e:
+                delay = min(delay * 2, MAX_PROBE_DELAY_SECONDS)
+                print(f"CircuitBreaker: probe failed ({e}), next probe in {delay}s")
+                continue
+            with self._lock:
+                self.is_open = False
+                self.consecutive_failures = 0
+            print("CircuitBreaker: probe succeeded, model calls resumed")
+            return
+
+
+class ModelGuard:
+    """Rate limiter and circuit breaker in front of every model call."""
+    def __init__(self, probe_func, requests_per_minute=None, burst=DEFAULT_BURST):
+        requests_per_minute = requests_per_minute or float(os.getenv("LLM_RATE_LIMIT_RPM", DEFAULT_REQUESTS_PER_MINUTE))
+        self.bucket = TokenBucket(requests_per_minute / 60, burst)
+        self.breaker = CircuitBreaker(probe_func)
+        self.rejected = 0
+
+    def before_call(self):
+        """Raises a GuardRejectedError if the call must not go out now."""
+        if self.breaker.is_open:
+            self.rejected += 1
+            raise CircuitOpenError("model calls are paused after repeated failures")
+        if not self.bucket.acquire(MAX_TOKEN_WAIT_SECONDS):
+            self.rejected += 1
+            raise RateLimitedError("too many model calls, try again shortly")
+
+    def call(self, func, *args, **kwargs):
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def get_stats(self):
+        return {"circuit_open": self.breaker.is_open, "times_opened": self.breaker.times_opened,
+                "consecutive_failures": self.breaker.consecutive_failures, "rejected": self.rejected,
+                "tokens": round(self.bucket.tokens, 2)}
+
+
+class GuardedChatSession:
+    """Chat session whose messages go through the guard. history is passed through to the wrapped session."""
+    def __init__(self, chat_session, guard):
+        self._chat_session = chat_session
+        self._guard = guard
+
+    @property
+    def history(self):
+        return self._chat_session.history
+
+    @history.setter
+    def history(self, messages):
+        self._chat_session.history = messages
+
+    def send_message(self, message, stream=False):
+        if not stream:
+            return self._guard.call(self._chat_session.send_message, message)
+        return self._stream(message)
+
+    def _stream(self, message):
+        self._guard.before_call()
+        try:
+            for chunk in self._chat_session.send_message(message, stream=True):
+                yield chunk
+        except Exception:
+            self._guard.breaker.record_failure()
+            raise
+        self._guard.breaker.record_success()
+
+
+class GuardedBackend:
+    """Wraps a ModelBackend so all of its calls, chat messages included, go through a ModelGuard."""
+    def __init__(self, backend, guard):
+        self.backend = backend
+        self.guard = guard
+        self.name = backend.name
+
+    def generate(self, model_name, contents):
+        return self.guard.call(self.backend.generate, model_name, contents)
+
+    def start_chat(self, model_name, system_instruction):
+        return GuardedChatSession(self.backend.start_chat(model_name, system_instruction), self.guard)
+
+    def list_models(self):
+        return self.backend.list_models()
+
+    def warm_up(self):
+        self.backend.warm_up()
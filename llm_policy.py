@@ -0,0 +1,162 @@
+import bisect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from llm_guard import GuardRejectedError
+
+# Upper bounds (seconds) of the latency histogram buckets, the last bucket takes everything slower
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0, 12.0, 20.0, 30.0)
+DEFAULT_DEADLINE_SECONDS = 12
+# Hedge delay used until a model has enough samples for a meaningful p90
+DEFAULT_HEDGE_DELAY_SECONDS = 3.0
+MIN_SAMPLES_FOR_P90 = 20
+# Requests running at once for all policies, including hedges and losers that are still finishing
+MAX_POLICY_WORKERS = 8
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when no model answered before the policy's deadline."""
+
+
+class LatencyHistogram:
+    """Counts of call latencies per bucket, for percentiles that are cheap to keep for every call."""
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.total += 1
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls (None without samples)."""
+        with self._lock:
+            if not self.total:
+                return None
+            threshold = fraction * self.total
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= threshold:
+                    return self.buckets[index] if index < len(self.buckets) else float("inf")
+
+    def summary(self):
+        p50, p90, p99 = self.percentile(0.5), self.percentile(0.9), self.percentile(0.99)
+        return f"{self.total} calls, {self.errors} errors, p50 <= {p50}s, p90 <= {p90}s, p99 <= {p99}s"
+
+
+class RequestPolicy:
+    """How one kind of call is made: its model, an optional fallback model to hedge with, and its deadline."""
+    def __init__(self, model_name, fallback_model=None, deadline=DEFAULT_DEADLINE_SECONDS, hedge=True):
+        self.model_name = model_name
+        self.fallback_model = fallback_model
+        self.deadline = deadline
+        self.hedge = hedge and fallback_model is not None
+
+
+class RequestPolicyRunner:
+    """
+    Runs calls under a RequestPolicy.
+
+    The primary model is asked first. If it hasn't answered once its p90 latency has passed (or it failed),
+    the same request goes to the fallback model, and whichever answers first wins. The other request is
+    cancelled if it hasn't started, otherwise its late result is ignored (its latency is still recorded).
+    """
+    def __init__(self, max_workers=MAX_POLICY_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-policy")
+        self.histograms = {}  # {model_name: LatencyHistogram}
+        self._lock = threading.Lock()
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.deadlines_exceeded = 0
+
+    def get_histogram(self, model_name):
+        with self._lock:
+            histogram = self.histograms.get(model_name)
+            if histogram is None:
+                histogram = self.histograms[model_name] = LatencyHistogram()
+            return histogram
+
+    def get_hedge_delay(self, model_name):
+        histogram = self.get_histogram(model_name)
+        if histogram.total < MIN_SAMPLES_FOR_P90:
+            return DEFAULT_HEDGE_DELAY_SECONDS
+        return histogram.percentile(0.9)
+
+    def _timed_call(self, model_name, generate):
+        histogram = self.get_histogram(model_name)
+        start = time.perf_counter()
+        try:
+            result = generate(model_name)
+        except Exception:
+            histogram.record_error()
+            raise
+        histogram.record(time.perf_counter() - start)
+        return result
+
+    def call(self, policy, generate):
+        """Returns generate(model_name)'s result for the first model to answer. Raises the last error or DeadlineExceeded."""
+        deadline_at = time.monotonic() + policy.deadline
+        futures = {self.executor.submit(self._timed_call, policy.model_name, generate): policy.model_name}
+        hedge_at = time.monotonic() + self.get_hedge_delay(policy.model_name) if policy.hedge else None
+        last_error = None
+
+        try:
+            while futures:
+                now = time.monotonic()
+                if now >= deadline_at:
+                    break
+                wait_until = min(deadline_at, hedge_at) if hedge_at else deadline_at
+                done, _ = wait(futures, timeout=max(0, wait_until - now), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    model_name = futures.pop(future)
+                    try:
+                        result = future.result()
+                    except GuardRejectedError:
+                        raise  # The guard would reject a hedge just the same
+                    except Exception as e:
+                        print(f"RequestPolicy: {model_name} failed: {e}")
+                        last_error = e
+                        continue
+                    if model_name != policy.model_name:
+                        with self._lock:
+                            self.hedges_won += 1
+                    return result
+
+                # Hedge once: when the primary is slower than its p90, or failed before that
+                if hedge_at and (time.monotonic() >= hedge_at or not futures):
+                    hedge_at = None
+                    with self._lock:
+                        self.hedges_sent += 1
+                    print(f"RequestPolicy: no answer from {policy.model_name} yet, also asking {policy.fallback_model}")
+                    futures[self.executor.submit(self._timed_call, policy.fallback_model, generate)] = policy.fallback_model
+
+            if last_error is not None and not futures:
+                raise last_error
+            with self._lock:
+                self.deadlines_exceeded += 1
+            raise DeadlineExceeded(f"no answer from {policy.model_name} within {policy.deadline}s")
+        finally:
+            for future in futures:
+                future.cancel()  # Only stops requests that haven't started, a running loser just gets ignored
+
+    def print_latency_report(self):
+        print(f"RequestPolicy: {self.hedges_sent} hedges sent, {self.hedges_won} won by the fallback, "
+              f"{self.deadlines_exceeded} deadlines exceeded")
+        with self._lock:
+            histograms = list(self.histograms.items())
+        for model_name, histogram in histograms:
+            print(f"  {model_name}: {histogram.summary()}")
+
+
+# Shared instance for all model calls
+request_policy = RequestPolicyRunner()
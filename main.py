@@ -1,5 +1,9 @@
+import time
+startup_start_time = time.perf_counter()  # Before the other imports, so the startup time includes them
+
 import pygame
 import ctypes
+import os
 import sys
 import importlib
 from player import Player
@@ -17,6 +21,13 @@ from minigameManager import MinigameManager
 from quizManager import QuizManager
 from mysterious_rect import MysteriousRect
 from quoteTracker import QuoteTracker
+from asset_manager import assets
+from text_cache import get_font, render_text, text_cache
+from staticAPI import llm_executor, philosophy_question_pool, ai_question_pool
+from llm_cache import llm_cache
+from llm_policy import request_policy
+from llm_backend import get_backend, BackendUnavailableError
+import databaseHandler
 
 
 
@@ -36,12 +47,29 @@ except AttributeError:
 pygame.init()
 pygame.font.init()
 
+# Set screen dimensions
+screen_width = 1700
+screen_height = 900
+# Open the window and show the loading screen before the managers, maps and sprites are set up
+screen = pygame.display.set_mode((screen_width, screen_height))
+pygame.display.set_caption('Pygame Window')
+
+def draw_loading_screen(screen):
+    screen.fill((0, 0, 0))
+    loading_surface = render_text("Loading...", 48, (255, 255, 255))
+    screen.blit(loading_surface, loading_surface.get_rect(center=screen.get_rect().center))
+    pygame.display.flip()
+    pygame.event.pump()  # Keeps the window responsive while loading
+
+draw_loading_screen(screen)
+print(f"Startup: window shown after {(time.perf_counter() - startup_start_time) * 1000:.0f} ms")
+
 # Font for interaction popup
-interaction_font = pygame.font.Font(None, 72) # Added font
+interaction_font = get_font(72) # Added font
 
 # Point tracker
 player_points = 0
-points_font = pygame.font.Font(None, 36)
+points_font = get_font(36)
 
 # Typewriter effect state
 typing_active = False
@@ -56,11 +84,6 @@ show_interaction_popup = False
 player_can_move = True
 # player_has_interacted_this_visit = False # This will be handled by InteractionManager per interactable
 
-# Set screen dimensions
-screen_width = 1700
-screen_height = 900
-screen = pygame.display.set_mode((screen_width, screen_height))
-
 # Initialize ChatManager
 wizard_chat_manager = WizardChatManager(screen_width, screen_height)
 
@@ -155,14 +178,8 @@ map_height = 0
 # Instantiate MapManager FIRST, as other modules might need it during their setup if they call get_current_map_data
 map_manager = MapManager()
 
-# Now initialize tilemap, which might use map_manager if refactored to do so,
-# or main.py will pass map_manager.get_current_tile_size() etc.
-# Pass the tileset_width from the current map data
-tilemap.init_tilemap(
-    map_manager.current_map_data["tileset_path"],
-    map_manager.current_map_data["tileset_width"],
-    map_manager.current_map_data["tile_orig_size"] # Pass the specific original tile size for the initial map
-)
+# Now load the starting map's tileset and bake its tiles
+map_manager.activate_current_map()
 
 
 def update_map_dimensions_from_manager(new_width, new_height):
@@ -174,7 +191,7 @@ def update_map_dimensions_from_manager(new_width, new_height):
 def draw_point_tracker(screen):
     """Draw the point tracker at the top left of the screen"""
     points_text = f"Wisdom Points: {player_points}"
-    points_surface = points_font.render(points_text, True, (255, 255, 255))  # White text
+    points_surface = text_cache.render(points_font, points_text, True, (255, 255, 255))  # White text
     # Add a semi-transparent background for better visibility
     bg_rect = pygame.Rect(5, 5, points_surface.get_width() + 10, points_surface.get_height() + 10)
     pygame.draw.rect(screen, (0, 0, 0, 128), bg_rect)  # Semi-transparent black background
@@ -182,14 +199,11 @@ def draw_point_tracker(screen):
 
 
 # Initial map dimensions are set by MapManager based on the starting map ("main_map")
-map_width = len(map_manager.get_current_map_layout()[0]) * map_manager.get_current_tile_size()
-map_height = len(map_manager.get_current_map_layout()) * map_manager.get_current_tile_size()
+map_width = map_manager.get_current_map_layout().width * map_manager.get_current_tile_size()
+map_height = map_manager.get_current_map_layout().height * map_manager.get_current_tile_size()
 print(f"Initial map dimensions: {map_width}x{map_height}")
 
 
-# Set window title
-pygame.display.set_caption('Pygame Window')
-
 # Clock for controlling framerate
 clock = pygame.time.Clock()
 
@@ -232,6 +246,13 @@ interaction_manager.add_interactable(naval_npc)
 interaction_manager.add_interactable(mysterious_rect)
 # Add other NPCs to interaction_manager here as they are created
 
+def preload_next_map(eligible_interactable):
+    """Talking to the wizard usually ends in his house, so start loading it as soon as the player is in range."""
+    if eligible_interactable is wizard:
+        map_manager.preload("wizard_house")
+
+interaction_manager.add_eligibility_listener(preload_next_map)
+
 # Sprite group
 all_sprites = pygame.sprite.Group()
 all_sprites.add(player)
@@ -245,6 +266,7 @@ game_camera = Camera(screen_width, screen_height) # Create Camera instance
 
 # Game loop
 running = True
+first_frame_shown = False
 last_direction_keydown_event = None # Added to track the last directional key event
 while running:
     current_time_ticks = pygame.time.get_ticks() # Get current time once per frame for typing
@@ -322,6 +344,17 @@ while running:
                 else:
                     print("QuoteTracker: Must be signed in to view quotes")
 
+            elif event.key == pygame.K_F3:  # F3 to print cached image memory usage, text cache and LLM executor/cache/latency/guard stats
+                assets.print_memory_report()
+                print(f"TextCache: {text_cache.get_stats()}")
+                llm_executor.print_metrics()
+                print(f"LLMCache: {llm_cache.get_stats()}")
+                request_policy.print_latency_report()
+                try:
+                    print(f"ModelGuard: {get_backend().guard.get_stats()}")
+                except BackendUnavailableError as e:
+                    print(f"ModelGuard: {e}")
+
 
             elif event.key == pygame.K_u: # Check for 'U' key press
                 print("'U' key pressed. Attempting to reload and refresh map data...")
@@ -469,15 +502,20 @@ while running:
     settings_manager.set_current_points(player_points)
     
     if player_can_move and not wizard_chat_manager.is_active and not settings_manager.show_input_fields and not quiz_manager.is_active and not quote_tracker.should_disable_main_game_elements():
-        player.update_position(keys, map_width, map_height, last_direction_keydown_event, map_manager.can_move)        # Check for item collection after player movement
+        player.update_position(keys, map_width, map_height, last_direction_keydown_event, map_manager.rect_walkable)        # Check for item collection after player movement
         if map_manager.current_map_data["name"] == "main_map":  # Only on main map
+            # A coin might start the minigame, so get its arena ready while the player walks up to one
+            if tilemap.is_near_collectible(player.rect.centerx, player.rect.centery+10, map_manager.get_current_tile_size()):
+                map_manager.preload("minigame_arena")
+                quiz_manager.prefetch_questions(settings_manager.get_current_username() if settings_manager.is_signed_in else None)
             collection_result = tilemap.collect_item(player.rect.centerx, player.rect.centery+10, map_manager.get_current_tile_size())
             if collection_result == "collectible":
                 # Random chance to trigger minigame or quiz
                 rand_chance = random.random()
                 if rand_chance < 0.8:  # 80% chance for quiz
                     print("Quiz triggered!")
-                    quiz_manager.start_quiz(1)  # 1 point for this collectible
+                    current_username = settings_manager.get_current_username() if settings_manager.is_signed_in else None
+                    quiz_manager.start_quiz(1, current_username)  # 1 point for this collectible
                 elif rand_chance < 0.9:  # 10% chance for minigame (0.3 to 0.6)
                     print("Minigame triggered!")
                     minigame_manager.start_minigame(1, player.rect)  # 1 point for this collectible
@@ -504,6 +542,9 @@ while running:
     
     # Update quiz manager
     quiz_manager.update()
+
+    # Apply streamed wizard chat replies
+    wizard_chat_manager.update()
     
     # Handle interactions - only if not in minigame or quiz
     if not minigame_manager.should_disable_main_game_elements() and not quiz_manager.should_disable_main_game_elements():
@@ -587,7 +628,7 @@ while running:
     if not minigame_manager.should_disable_main_game_elements():
         if map_manager.current_map_name == "main_map":
             # Main map: update both player and NPCs
-            naval_npc.set_update_parameters(map_width, map_height, map_manager.can_move, player)
+            naval_npc.set_update_parameters(map_width, map_height, map_manager.rect_walkable, player)
             all_sprites.update()
         else:
             # Other maps (wizard house): only update player and map-specific entities
@@ -614,7 +655,7 @@ while running:
         # Draw countdown timer
         remaining_time = minigame_manager.get_remaining_time()
         timer_text = f"Survive: {remaining_time}s"
-        timer_surface = pygame.font.Font(None, 60).render(timer_text, True, (255, 0, 0))
+        timer_surface = render_text(timer_text, 60, (255, 0, 0))
         screen.blit(timer_surface, (screen_width // 2 - timer_surface.get_width() // 2, 70))
         
         # Draw hazards
@@ -698,7 +739,7 @@ while running:
         rendered_lines = []
         max_line_width = 0
         for line in popup_text_lines:
-            text_surface = interaction_font.render(line, True, (0, 0, 0)) # Black text
+            text_surface = text_cache.render(interaction_font, line, True, (0, 0, 0)) # Black text
             rendered_lines.append(text_surface)
             if text_surface.get_width() > max_line_width:
                 max_line_width = text_surface.get_width()
@@ -734,7 +775,7 @@ while running:
             second_rendered_lines = []
             second_max_line_width = 0
             for line in second_popup_lines:
-                text_surface = interaction_font.render(line, True, (0, 0, 0)) # Black text
+                text_surface = text_cache.render(interaction_font, line, True, (0, 0, 0)) # Black text
                 second_rendered_lines.append(text_surface)
                 if text_surface.get_width() > second_max_line_width:
                     second_max_line_width = text_surface.get_width()
@@ -779,6 +820,22 @@ while running:
     # Update the display
     pygame.display.flip()
 
+    if not first_frame_shown:
+        first_frame_shown = True
+        print(f"Startup: first frame shown after {(time.perf_counter() - startup_start_time) * 1000:.0f} ms")
+        if os.getenv("STARTUP_BENCHMARK"):
+            running = False  # startup_benchmark.py only measures the time to the first frame
+        else:
+            # Load the SDKs, connect to the database and have NPC questions ready before the first interaction,
+            # all in the background now that the game is on screen
+            try:
+                get_backend().warm_up()
+                philosophy_question_pool.fill()
+                ai_question_pool.fill()
+            except BackendUnavailableError as e:
+                print(f"LLM backend: {e}")
+            databaseHandler.warm_up()
+
     # Cap the framerate
     clock.tick(60)
 
@@ -1,77 +1,257 @@
 import pygame
+import threading
+import time
+from collections import OrderedDict
 import tilemap
 import wizardHouse
 from entity import Entity 
 import minigameMap
+from tile_layer import TileLayer, EMPTY_TILE_ID
+from collision_grid import CollisionGrid
+
+# Layer keys in map data dicts, and the value used to pad ragged rows of each
+LAYER_FILL_VALUES = {
+    "map_layout": EMPTY_TILE_ID,
+    "building_layout": EMPTY_TILE_ID,
+    "decoration_layout": EMPTY_TILE_ID,
+    "collision_layout": 1  # Missing collision tiles are walls
+}
+
+
+# How many maps keep their baked tiles, collision grid and static entities around after being left
+MAX_PREPARED_SCENES = 3
+
+
+class PreparedScene:
+    """Everything switch_map needs to show a map, built once and reused on later visits."""
+    def __init__(self, map_name, map_data, collision_grid, tileset, chunk_renderer, static_entities):
+        self.map_name = map_name
+        self.map_data = map_data
+        self.collision_grid = collision_grid
+        self.tileset = tileset  # tilemap tileset cache entry, None if the tileset failed to load
+        self.chunk_renderer = chunk_renderer
+        self.static_entities = static_entities  # pygame.sprite.Group
+        self.interactables = map_data.get("map_interactables", [])
 
 
 class MapManager:
-    def __init__(self):
-        self.maps = {
-            "main_map": tilemap.get_main_map_data(),
-            "wizard_house": wizardHouse.get_wizard_house_data(),
-            "minigame_arena": minigameMap.get_minigame_map_data() 
-        }
+    def __init__(self, max_prepared_scenes=MAX_PREPARED_SCENES):
+        # Map data is built on first use and then kept, since it also holds gameplay state (e.g. collectibles)
+        self.maps = {}
+        # LRU of PreparedScene objects, most recently used last
+        self.prepared_scenes = OrderedDict()
+        self.max_prepared_scenes = max_prepared_scenes
+        # Guards maps and prepared_scenes, which preload threads also fill
+        self._scene_lock = threading.RLock()
+        self._preload_threads = {}  # {map_name: Thread} for preloads still running
+
         self.current_map_name = "main_map"
-        self.current_map_data = self.maps[self.current_map_name]
+        self.current_map_data = self.get_map_data(self.current_map_name)
+        self.collision_grid = self._build_collision_grid(self.current_map_data)
         self.current_map_specific_interactables = []  # Stores interactables loaded for the current map
         self.static_entities = pygame.sprite.Group()  # Group for static entities
 
+    @staticmethod
+    def _with_tile_layers(map_data):
+        """Makes sure every layer of the map data is a TileLayer (map modules already provide them)."""
+        for layer_key, fill_value in LAYER_FILL_VALUES.items():
+            if map_data.get(layer_key) is not None:
+                map_data[layer_key] = TileLayer.ensure(map_data[layer_key], fill_value)
+        return map_data
+
+    @staticmethod
+    def _build_collision_grid(map_data):
+        return CollisionGrid(map_data["collision_layout"], map_data["tile_size"])
+
+    @staticmethod
+    def _build_map_data(map_name):
+        """Calls the map module that defines map_name. Returns None for unknown maps."""
+        if map_name == "main_map":
+            return tilemap.get_main_map_data()
+        elif map_name == "wizard_house":
+            return wizardHouse.get_wizard_house_data()
+        elif map_name == "minigame_arena":
+            return minigameMap.get_minigame_map_data()
+        return None
+
+    def get_map_data(self, map_name):
+        """Returns the data for map_name, building it the first time it is asked for."""
+        with self._scene_lock:
+            map_data = self.maps.get(map_name)
+            if map_data is None:
+                map_data = self._build_map_data(map_name)
+                if map_data is None:
+                    return None
+                map_data = self.maps[map_name] = self._with_tile_layers(map_data)
+                print(f"Built map data for '{map_name}'.")
+            return map_data
+
+    @staticmethod
+    def _get_drawn_layers(map_data):
+        return [
+            map_data["map_layout"],
+            map_data.get("building_layout"),
+            map_data.get("decoration_layout")
+        ]
+
+    @staticmethod
+    def _create_static_entities(map_data):
+        """Creates (and scales) the static entity sprites listed in the map data."""
+        static_entities = pygame.sprite.Group()
+        for entity_data in map_data.get("static_entity_data", []):
+            tile_x = entity_data["tile_x"]
+            tile_y = entity_data["tile_y"]
+            image_path = entity_data["image_path"]
+            scale_to_size = entity_data.get("scale_to_size")  # Optional scaling
+
+            # Calculate pixel position based on tile coordinates and tile size
+            pixel_x = tile_x * map_data["tile_size"]
+            pixel_y = tile_y * map_data["tile_size"]
+
+            # The asset manager hands out the already scaled surface on later builds
+            entity = Entity(pixel_x, pixel_y, image_path, scale_to_size)
+
+            static_entities.add(entity)
+        return static_entities
+
+    def _prepare_scene(self, map_name, map_data):
+        """Loads the tileset, bakes every chunk and builds the collision grid and static entities of a map."""
+        tile_size = map_data["tile_size"]
+        layers = self._get_drawn_layers(map_data)
+        tileset = None
+        chunk_renderer = None
+        try:
+            tileset = tilemap.load_tileset(map_data["tileset_path"], map_data["tileset_width"], map_data["tile_orig_size"])
+            tilemap.warm_tile_cache(layers, tile_size, tileset)
+            chunk_renderer = tilemap.get_chunk_renderer(*layers, tile_size, tileset=tileset)
+            chunk_renderer.bake_all()
+        except pygame.error as e:
+            print(f"CRITICAL PYGAME ERROR loading tileset '{map_data['tileset_path']}': {e}")
+
+        return PreparedScene(
+            map_name,
+            map_data,
+            self._build_collision_grid(map_data),
+            tileset,
+            chunk_renderer,
+            self._create_static_entities(map_data)
+        )
+
+    def get_prepared_scene(self, map_name):
+        """Returns the prepared scene for map_name from the LRU cache, preparing it on a miss."""
+        # If a preload of this map is still running, wait for it instead of preparing it twice
+        preload_thread = self._preload_threads.get(map_name)
+        if preload_thread and preload_thread is not threading.current_thread():
+            preload_thread.join()
+
+        with self._scene_lock:
+            scene = self.prepared_scenes.get(map_name)
+            if scene is not None:
+                self.prepared_scenes.move_to_end(map_name)
+                return scene
+
+        map_data = self.get_map_data(map_name)
+        if map_data is None:
+            return None
+        # Prepared outside the lock so a preload doesn't block the game thread's own lookups
+        scene = self._prepare_scene(map_name, map_data)
+        with self._scene_lock:
+            self.prepared_scenes[map_name] = scene
+            self._evict_prepared_scenes(keep=map_name)
+        return scene
+
+    def preload(self, map_name):
+        """
+        Hint that map_name is likely to be shown soon. Prepares its scene on a background thread
+        so the later switch_map only swaps references. Does nothing if it is ready or already loading.
+        """
+        if map_name == self.current_map_name or map_name in self.prepared_scenes or map_name in self._preload_threads:
+            return
+        thread = threading.Thread(target=self._preload_worker, args=(map_name,), daemon=True)
+        self._preload_threads[map_name] = thread
+        thread.start()
+
+    def _preload_worker(self, map_name):
+        try:
+            start_time = time.perf_counter()
+            if self.get_prepared_scene(map_name):
+                print(f"Preloaded map '{map_name}' in {(time.perf_counter() - start_time) * 1000:.1f} ms.")
+        except Exception as e:
+            # switch_map will just prepare the scene itself
+            print(f"Error preloading map '{map_name}': {e}")
+        finally:
+            self._preload_threads.pop(map_name, None)
+
+    def _evict_prepared_scenes(self, keep):
+        """Drops least recently used scenes over the limit. The current map and `keep` are never evicted."""
+        for map_name in list(self.prepared_scenes):
+            if len(self.prepared_scenes) <= self.max_prepared_scenes:
+                break
+            if map_name in (keep, self.current_map_name):
+                continue
+            self._release_scene(self.prepared_scenes.pop(map_name))
+            print(f"Evicted prepared scene '{map_name}'.")
+
+    def _release_scene(self, scene):
+        map_data = scene.map_data
+        tilemap.release_chunk_renderer(map_data["map_layout"], map_data["tile_size"])
+        # Only drop the tileset if no other prepared scene still draws with it
+        if scene.tileset and not any(other.tileset is scene.tileset for other in self.prepared_scenes.values()):
+            tilemap.release_tileset(scene.tileset)
+
+    def clear_prepared_scenes(self):
+        for thread in list(self._preload_threads.values()):
+            thread.join()
+        with self._scene_lock:
+            for map_name in list(self.prepared_scenes):
+                self._release_scene(self.prepared_scenes.pop(map_name))
+
+    @staticmethod
+    def _activate_scene_tileset(scene):
+        if scene.tileset:
+            tilemap.activate_tileset(scene.tileset)
+        else:
+            tilemap.tileset_img = None  # draw_map skips drawing without a tileset
+
+    def activate_current_map(self):
+        """Prepares the starting map's scene and makes its tileset the active one (needs a display mode set)."""
+        scene = self.get_prepared_scene(self.current_map_name)
+        self.collision_grid = scene.collision_grid
+        self._activate_scene_tileset(scene)
+
     def switch_map(self, map_name, player, wizard_sprite, all_sprites_group, interaction_mgr, update_dimensions_func):  # MODIFIED SIGNATURE
-        if map_name in self.maps:
+        scene = self.get_prepared_scene(map_name)
+        if scene:
             # Clear existing map-specific interactables from the previous map
             for interactable in self.current_map_specific_interactables:
                 interaction_mgr.remove_interactable(interactable.id)  # Assuming interactable has an 'id' attribute
             self.current_map_specific_interactables = []
 
-            # Clear static entities from the previous map
+            # Take the previous map's static entities out of the drawing group (the scene cache keeps them)
             for entity in self.static_entities:
                 all_sprites_group.remove(entity)  # Remove each entity from main drawing group
-            self.static_entities.empty()  # Then clear the static entities group
 
             self.current_map_name = map_name
-            self.current_map_data = self.maps[map_name]
+            self.current_map_data = scene.map_data
+            self.collision_grid = scene.collision_grid
             print(f"Switched to map: {map_name}")
 
-            # CORRECTED KEY and ADDED tileset_width argument
-            # Ensure tilemap.init_tilemap is called to load the correct tileset
-            tilemap.init_tilemap(
-                self.current_map_data["tileset_path"],
-                self.current_map_data["tileset_width"],
-                self.current_map_data["tile_orig_size"]
-            )
-
-            # Load and register new map-specific interactables for the current map
-            new_map_interactables = self.current_map_data.get("map_interactables", [])
-            for interactable_obj in new_map_interactables:
+            # Tiles are already loaded, scaled and baked, only the active tileset changes
+            self._activate_scene_tileset(scene)
+
+            # Register the current map's interactables
+            for interactable_obj in scene.interactables:
                 interaction_mgr.add_interactable(interactable_obj) # Pass the object itself
                 self.current_map_specific_interactables.append(interactable_obj)
             print(f"Loaded {len(self.current_map_specific_interactables)} map-specific interactables for {map_name}.")
 
-            # Load static entities for the current map
-            static_entity_data_list = self.current_map_data.get("static_entity_data", [])
-            for entity_data in static_entity_data_list:
-                tile_x = entity_data["tile_x"]
-                tile_y = entity_data["tile_y"]
-                image_path = entity_data["image_path"]
-                scale_to_size = entity_data.get("scale_to_size")  # Optional scaling
-
-                # Calculate pixel position based on tile coordinates and tile size
-                pixel_x = tile_x * self.current_map_data["tile_size"]
-                pixel_y = tile_y * self.current_map_data["tile_size"]
-
-                entity = Entity(pixel_x, pixel_y, image_path)
-                if scale_to_size:
-                    entity.image = pygame.transform.scale(entity.image, scale_to_size)
-                    entity.rect = entity.image.get_rect(topleft=(pixel_x, pixel_y))
-
-                self.static_entities.add(entity)
-                all_sprites_group.add(entity)  # Add to main drawing group
+            self.static_entities = scene.static_entities
+            all_sprites_group.add(*self.static_entities)  # Add to main drawing group
             print(f"Loaded {len(self.static_entities)} static entities for {map_name}.")
 
             # Update game-wide map dimensions
-            new_map_width_pixels = len(self.current_map_data["map_layout"][0]) * self.current_map_data["tile_size"]
-            new_map_height_pixels = len(self.current_map_data["map_layout"]) * self.current_map_data["tile_size"]
+            new_map_width_pixels = self.current_map_data["map_layout"].width * self.current_map_data["tile_size"]
+            new_map_height_pixels = self.current_map_data["map_layout"].height * self.current_map_data["tile_size"]
 
             update_dimensions_func(new_map_width_pixels, new_map_height_pixels)  # MODIFIED CALL
 
@@ -115,6 +295,10 @@ class MapManager:
         else:
             self.switch_map("main_map", player, wizard_sprite, all_sprites_group, interaction_mgr, update_dimensions_func)
 
+    def get_current_drawn_layers(self):
+        """Returns the current map's drawable layers, used to pre-scale their tiles."""
+        return self._get_drawn_layers(self.current_map_data)
+
     def get_current_map_layout(self):
         return self.current_map_data["map_layout"]
 
@@ -151,26 +335,24 @@ class MapManager:
             # ensure they are cleared/re-added during the actual switch_map or a similar full refresh.
 
         fresh_map_data = None
-        if self.current_map_name == "main_map":
-            fresh_map_data = tilemap.get_main_map_data()
-        elif self.current_map_name == "wizard_house":
-            fresh_map_data = wizardHouse.get_wizard_house_data()
+        if self.current_map_name in ("main_map", "wizard_house"):
+            fresh_map_data = self._build_map_data(self.current_map_name)
         else:
             print(f"Warning: Unknown map name '{self.current_map_name}' during refresh.")
             return
 
         if fresh_map_data:
-            self.current_map_data = fresh_map_data
+            # Reloaded modules start with empty tileset and chunk caches, so every prepared scene is stale
+            self.clear_prepared_scenes()
+            self.maps[self.current_map_name] = self._with_tile_layers(fresh_map_data)
+            scene = self.get_prepared_scene(self.current_map_name)
+            self.current_map_data = scene.map_data
+            self.collision_grid = scene.collision_grid
             # Re-initialize tilemap for the reloaded map data
-            tilemap.init_tilemap(
-                self.current_map_data["tileset_path"],
-                self.current_map_data["tileset_width"],
-                self.current_map_data["tile_orig_size"]
-            )
+            self._activate_scene_tileset(scene)
             # Reload map-specific interactables if manager is provided
             if interaction_mgr:
-                new_map_interactables = self.current_map_data.get("map_interactables", [])
-                for interactable_obj in new_map_interactables:
+                for interactable_obj in scene.interactables:
                     interaction_mgr.add_interactable(interactable_obj) # Pass the object itself
                     self.current_map_specific_interactables.append(interactable_obj)
                 print(f"Refreshed and reloaded {len(self.current_map_specific_interactables)} map-specific interactables.")
@@ -179,28 +361,12 @@ class MapManager:
             # Note: This requires all_sprites_group to be passed or handled appropriately if entities need to be re-added to it.
             # For now, we'll just reload them into self.static_entities.
             # The main game loop should handle drawing from this group.
-            static_entity_data_list = self.current_map_data.get("static_entity_data", [])
-            for entity_data in static_entity_data_list:
-                tile_x = entity_data["tile_x"]
-                tile_y = entity_data["tile_y"]
-                image_path = entity_data["image_path"]
-                scale_to_size = entity_data.get("scale_to_size")
-
-                pixel_x = tile_x * self.current_map_data["tile_size"]
-                pixel_y = tile_y * self.current_map_data["tile_size"]
-
-                entity = Entity(pixel_x, pixel_y, image_path)
-                if scale_to_size:
-                    entity.image = pygame.transform.scale(entity.image, scale_to_size)
-                    entity.rect = entity.image.get_rect(topleft=(pixel_x, pixel_y))
-                self.static_entities.add(entity)
-                # IMPORTANT: If all_sprites_group was cleared elsewhere, entities need to be re-added.
-                # This part might need adjustment based on how all_sprites_group is managed during a reload.
+            self.static_entities = scene.static_entities
             print(f"Refreshed and reloaded {len(self.static_entities)} static entities.")
 
             # Update dimensions
-            new_map_width_pixels = len(self.current_map_data["map_layout"][0]) * self.current_map_data["tile_size"]
-            new_map_height_pixels = len(self.current_map_data["map_layout"]) * self.current_map_data["tile_size"]
+            new_map_width_pixels = self.current_map_data["map_layout"].width * self.current_map_data["tile_size"]
+            new_map_height_pixels = self.current_map_data["map_layout"].height * self.current_map_data["tile_size"]
             update_dimensions_func(new_map_width_pixels, new_map_height_pixels)
 
             print(f"Map '{self.current_map_name}' data refreshed and dimensions updated.")
@@ -209,12 +375,12 @@ class MapManager:
 
     def can_move(self, world_x, world_y):
         """Checks if the given world coordinates are walkable on the current map."""
-        tile_size = self.get_current_tile_size()
-        tile_x = world_x // tile_size
-        tile_y = world_y // tile_size
+        return self.collision_grid.is_walkable_at(world_x, world_y)  # Out of bounds is not walkable
 
-        collision_layout = self.get_current_collision_layout()
+    def footprint_blocked(self, x, y, w, h):
+        """Checks every tile covered by the world-space rectangle in one call. True if any is a wall."""
+        return self.collision_grid.footprint_blocked(x, y, w, h)
 
-        if 0 <= tile_y < len(collision_layout) and 0 <= tile_x < len(collision_layout[0]):
-            return collision_layout[tile_y][tile_x] == 0
-        return False  # Out of bounds is not walkable
+    def rect_walkable(self, rect):
+        """Returns True if every tile under the rect is walkable on the current map."""
+        return self.collision_grid.rect_walkable(rect)
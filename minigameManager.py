@@ -1,6 +1,7 @@
 import pygame
 import random
 import time
+from text_cache import get_font, render_text
 from minigameMap import MinigameHazard
 from minigameMap import (HAZARD_RADIUS, PLAYER_COLLISION_MARGIN_LEFT, 
                         PLAYER_COLLISION_MARGIN_RIGHT, PLAYER_COLLISION_MARGIN_TOP, 
@@ -84,16 +85,15 @@ class MinigameManager:
         # Draw debug text with freeze status
         freeze_text = " [FROZEN]" if hazards_frozen else ""
         debug_text = f"Debug: Player({player_rect.centerx}, {player_rect.centery}) HR:{HAZARD_RADIUS}{freeze_text}"
-        font = pygame.font.Font(None, 30)
-        text_surface = font.render(debug_text, True, (255, 255, 255))
+        # Changes whenever the player moves, so it isn't worth caching the surface
+        text_surface = get_font(30).render(debug_text, True, (255, 255, 255))
         screen.blit(text_surface, (10, 50))
         
         # Add freeze countdown
         if hazards_frozen:
             remaining_freeze = (self.hazard_freeze_duration - elapsed_time) / 1000.0
             freeze_countdown = f"Hazards activate in: {remaining_freeze:.1f}s"
-            freeze_font = pygame.font.Font(None, 40)
-            freeze_surface = freeze_font.render(freeze_countdown, True, (100, 150, 255))
+            freeze_surface = render_text(freeze_countdown, 40, (100, 150, 255))
             screen.blit(freeze_surface, (10, 80))
         
     def draw_speed_popup(self, screen):
@@ -113,8 +113,8 @@ class MinigameManager:
                 alpha = max(50, int(255 * (1 - fade_progress)))
             
             # Create popup surface with background
-            font = pygame.font.Font(None, 48)
-            text_surface = font.render(self.speed_popup_text, True, (255, 255, 100))  # Bright yellow text
+            # Copy the cached surface since the fade changes its alpha
+            text_surface = render_text(self.speed_popup_text, 48, (255, 255, 100)).copy()  # Bright yellow text
             
             # Create background with padding
             padding = 20
@@ -165,7 +165,6 @@ class MinigameManager:
         alpha = max(50, int(255 * (1 - fade_progress)))  # Minimum alpha of 50, fades to transparent
         
         # Create large, centered popup
-        font = pygame.font.Font(None, 72)  # Large font
         lines = self.result_popup_text.split('\n')
         
         # Calculate total dimensions
@@ -174,7 +173,7 @@ class MinigameManager:
         total_height = 0
         
         for line in lines:
-            line_surface = font.render(line, True, (255, 255, 255))  # White text
+            line_surface = render_text(line, 72, (255, 255, 255)).copy()  # White text, copied since the fade changes its alpha
             line_surfaces.append(line_surface)
             max_width = max(max_width, line_surface.get_width())
             total_height += line_surface.get_height()
@@ -301,8 +300,8 @@ class MinigameManager:
         min_distance = 400  # Increased from 300
         
         # Calculate arena bounds more precisely
-        arena_width = len(MINIGAME_COLLISION_MAP[0]) * TILE_GAME_SIZE
-        arena_height = len(MINIGAME_COLLISION_MAP) * TILE_GAME_SIZE
+        arena_width = MINIGAME_COLLISION_MAP.width * TILE_GAME_SIZE
+        arena_height = MINIGAME_COLLISION_MAP.height * TILE_GAME_SIZE
         
         # Add debug output for player position validation
         print(f"Player position: ({player_x}, {player_y})")
@@ -325,9 +324,7 @@ class MinigameManager:
             distance_from_player = ((x - player_x) ** 2 + (y - player_y) ** 2) ** 0.5
             
             # Enhanced validation
-            if (0 <= tile_y < len(MINIGAME_COLLISION_MAP) and 
-                0 <= tile_x < len(MINIGAME_COLLISION_MAP[0]) and
-                MINIGAME_COLLISION_MAP[tile_y][tile_x] == 0 and
+            if (MINIGAME_COLLISION_MAP.get_or_default(tile_x, tile_y, 1) == 0 and
                 distance_from_player >= min_distance):
                 
                 hazards.append(MinigameHazard(x, y, self.current_speed))
@@ -358,9 +355,7 @@ class MinigameManager:
                     tile_x = int(safe_x // TILE_GAME_SIZE)
                     tile_y = int(safe_y // TILE_GAME_SIZE)
                     
-                    if (0 <= tile_y < len(MINIGAME_COLLISION_MAP) and 
-                        0 <= tile_x < len(MINIGAME_COLLISION_MAP[0]) and
-                        MINIGAME_COLLISION_MAP[tile_y][tile_x] == 0):
+                    if MINIGAME_COLLISION_MAP.get_or_default(tile_x, tile_y, 1) == 0:
                         
                         hazards.append(MinigameHazard(safe_x, safe_y, self.current_speed))
                         print(f"Fallback hazard spawned at ({safe_x}, {safe_y}), distance: {distance_check:.1f}")
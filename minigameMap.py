@@ -1,5 +1,6 @@
 import pygame
 import random
+from tile_layer import TileLayer
 
 HAZARD_RADIUS = 20
 PLAYER_COLLISION_MARGIN_LEFT = 37
@@ -13,7 +14,7 @@ TILESET_WIDTH_MINIGAME = 45
 EMPTY_TILE_ID = -1
 
 # Define minigame map layout (smaller, arena-style)
-MINIGAME_MAP = [
+MINIGAME_MAP = TileLayer.from_rows([
     # 15x15 arena with walls around edges
     [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
     [-1, 46, 47, 47, 47, 47, 47, 47, 47, 47, 47, 47, 47, 47, 47, 47, 47, 47, 47, 47, 47, 47, 48, -1],
@@ -28,9 +29,9 @@ MINIGAME_MAP = [
     [-1, 91, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 93],
     [-1, 91, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 92, 93],
     [-1,136,137,137,137,137,137,137,137,137,137,137,137,137,137,137,137,137,137,137,137,137,138]
-]
+], fill_value=EMPTY_TILE_ID)
 
-MINIGAME_COLLISION_MAP = [
+MINIGAME_COLLISION_MAP = TileLayer.from_rows([
     # Collision data matching the map
     [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
     [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
@@ -46,7 +47,7 @@ MINIGAME_COLLISION_MAP = [
     [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
     [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
     [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
-]
+], fill_value=1)  # Missing tiles are walls
 
 class MinigameHazard:
     """Represents moving hazards in the minigame"""
@@ -105,12 +106,8 @@ class MinigameHazard:
         tile_x = int(x // TILE_GAME_SIZE)
         tile_y = int(y // TILE_GAME_SIZE)
         
-        # Check bounds
-        if tile_y < 0 or tile_y >= len(MINIGAME_COLLISION_MAP) or tile_x < 0 or tile_x >= len(MINIGAME_COLLISION_MAP[0]):
-            return False
-        
-        # Check if tile is walkable (0 = walkable, 1 = wall)
-        return MINIGAME_COLLISION_MAP[tile_y][tile_x] == 0
+        # Check if tile is walkable (0 = walkable, 1 = wall); out of bounds counts as a wall
+        return MINIGAME_COLLISION_MAP.get_or_default(tile_x, tile_y, 1) == 0
     
     def _bounce_off_wall(self):
         """Change direction when hitting a wall"""
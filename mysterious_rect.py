@@ -1,7 +1,7 @@
 import pygame
-import threading
-import textwrap
-from staticAPI import get_AI_question
+from staticAPI import get_AI_question, ai_question_pool, llm_executor
+from text_cache import get_font
+from text_layout import wrap_paragraphs
 
 class MysteriousRect:
     def __init__(self, x, y, width=60, height=60, interaction_radius=50):
@@ -23,76 +23,61 @@ class MysteriousRect:
         self.prompt_talk = "Press E to interact with the mysterious rectangle. \n Press Q to walk away."
         self.interaction_message = self.prompt_talk
         self.is_fetching_response = False
-        self.response_fetch_thread = None
+        self.response_request_id = None
+        self.request_generation = 0  # Bumped on reset so a late answer can't overwrite the prompt
         self.new_message_to_type = False  # AI speaking state
 
     def request_new_response(self):
         """Request a new AI response for interaction"""
         if not self.is_fetching_response:
+            response = ai_question_pool.take()
+            if response:
+                self._show_response(response)
+                self.new_message_to_type = True
+                return
+            # Nothing ready yet, ask the API now
             self.is_fetching_response = True
             self.interaction_message = "The rectangle is thinking..."
             self.new_message_to_type = True
-            self.response_fetch_thread = threading.Thread(target=self._fetch_and_update_response)
-            self.response_fetch_thread.daemon = True
-            self.response_fetch_thread.start()
+            generation = self.request_generation
+            self.response_request_id = llm_executor.submit(
+                get_AI_question, lambda response: self._on_response_fetched(response, generation))
 
-    def _fetch_and_update_response(self):
-        """Fetch AI response for interaction (runs in separate thread)"""
-        try:
-            response = get_AI_question()
-            
-            if response and response != "Could not fetch a joke.":
-                # Store raw response, let get_wrapped_message_for_display() handle wrapping
-                self.interaction_message = f"The rectangle asks:\n\"{response}\""
-            else:
-                self.interaction_message = "The rectangle seems lost in thought. Please try again later."
-        except Exception as e:
-            print(f"Error fetching AI response for Mysterious Rectangle: {e}")
+    def _on_response_fetched(self, response, generation):
+        """Shows the AI response (called on an executor thread, response is None if the call failed or timed out)"""
+        if generation != self.request_generation:
+            return  # The player walked away in the meantime
+        self.response_request_id = None
+        if response is None:
             self.interaction_message = "The rectangle is having trouble speaking right now."
-        finally:
-            self.is_fetching_response = False
-            self.new_message_to_type = True
+        else:
+            self._show_response(response)
+        self.is_fetching_response = False
+        self.new_message_to_type = True
+
+    def _show_response(self, response):
+        if response and response != "Could not fetch a joke.":
+            # Store raw response, let get_wrapped_message_for_display() handle wrapping
+            self.interaction_message = f"The rectangle asks:\n\"{response}\""
+        else:
+            self.interaction_message = "The rectangle seems lost in thought. Please try again later."
 
     def get_wrapped_message_for_display(self, screen_width):
         """Returns the interaction message properly wrapped for screen display"""
-        # First, handle existing manual newlines properly
-        lines_from_manual_breaks = self.interaction_message.split('\n')
-        final_lines = []
-        
-        # Use font-based wrapping like QuizManager does
+        # Use font-based wrapping like QuizManager does (the layout is cached, so this is cheap every frame)
         max_width = screen_width - 120  # Leave margin for popup
-        font = pygame.font.Font(None, 72)  # Same as interaction_font
-        
-        for line in lines_from_manual_breaks:
-            if not line.strip():  # Empty line, keep it
-                final_lines.append("")
-                continue
-                
-            words = line.split(' ')
-            wrapped_lines = []
-            current_line = ""
-            
-            for word in words:
-                test_line = current_line + (" " if current_line else "") + word
-                if font.size(test_line)[0] <= max_width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        wrapped_lines.append(current_line)
-                        current_line = word
-                    else:
-                        wrapped_lines.append(word)
-            
-            if current_line:
-                wrapped_lines.append(current_line)
-            
-            final_lines.extend(wrapped_lines)
+        font = get_font(72)  # Same as interaction_font
+        final_lines = wrap_paragraphs(self.interaction_message, font, max_width)
         
         return '\n'.join(final_lines)
 
 
     def reset_interaction_state(self):
         """Reset the rectangle's interaction state"""
+        self.request_generation += 1
+        if self.response_request_id is not None:
+            llm_executor.cancel(self.response_request_id)
+            self.response_request_id = None
         self.interaction_message = self.prompt_talk
         self.is_fetching_response = False
         self.new_message_to_type = False
@@ -1,20 +1,22 @@
 import pygame
 import random
-import textwrap
 from entity import Entity
+from asset_manager import get_image
+from text_cache import get_font, text_cache
+from text_layout import wrap_chars
 from databaseHandler import DatabaseHandler
 
 
 class NavalNPC(Entity):
     def __init__(self, x, y, interaction_radius=50):
+        # Scale the loaded image to appropriate dimensions
+        npc_size = (84, 128)  # Similar to wizard size
         # Entity's __init__ loads the image and sets self.image and self.rect
-        super().__init__(x, y, "images/npcs/navalSprite.png")
+        super().__init__(x, y, "images/npcs/navalSprite.png", npc_size)
         self.id = f"naval_npc_{x}_{y}"  # Unique ID for this interactable
         
-        # Scale the loaded image to appropriate dimensions
-        npc_size = (84, 128)  # Similar to wizard size
-        self.image_right = pygame.transform.scale(self.image, npc_size)
-        self.image_left = pygame.transform.flip(self.image_right, True, False)
+        self.image_right = self.image
+        self.image_left = get_image("images/npcs/navalSprite.png", npc_size, flip_x=True)
         
         self.facing_right = True
         self.image = self.image_right
@@ -152,28 +154,13 @@ class NavalNPC(Entity):
                     can_move = False
 
             if collision_check_func:
-                # Check collision at key points (similar to player collision detection)
+                # Check every tile under the lower half of the NPC (similar to player collision detection)
                 npc_w = self.rect.width
                 npc_h = self.rect.height
-                
-                # Check lower half collision points
-                y_lower_half_top = future_y + npc_h // 2
-                y_lower_half_bottom = future_y + npc_h - 1
                 horizontal_offset = npc_w // 3
-                x_collision_left = future_x + horizontal_offset
-                x_collision_right = future_x + npc_w - 1 - horizontal_offset
-                x_center = future_x + npc_w // 2
-                
-                # Check collision points
-                if not collision_check_func(x_collision_left, y_lower_half_bottom):
-                    can_move = False
-                elif not collision_check_func(x_collision_right, y_lower_half_bottom):
-                    can_move = False
-                elif not collision_check_func(x_center, y_lower_half_bottom):
-                    can_move = False
-                elif not collision_check_func(x_collision_left, y_lower_half_top):
-                    can_move = False
-                elif not collision_check_func(x_collision_right, y_lower_half_top):
+                footprint = pygame.Rect(future_x + horizontal_offset, future_y + npc_h // 2,
+                                        npc_w - 2 * horizontal_offset, npc_h - npc_h // 2)
+                if not collision_check_func(footprint):
                     can_move = False
             
             # Apply movement if no collision
@@ -308,9 +295,8 @@ class NavalNPC(Entity):
             bubble_center_y = self.rect.top + self.speech_bubble_offset_y + camera.camera.y
             
             # Render speech text with wrapping
-            font = pygame.font.Font(None, 30)
-            wrapped_text = textwrap.fill(self.current_speech, width=30)
-            speech_lines = wrapped_text.split('\n')
+            font = get_font(30)
+            speech_lines = wrap_chars(self.current_speech, 30)
             
             # Calculate bubble dimensions
             line_height = font.get_linesize()
@@ -318,7 +304,7 @@ class NavalNPC(Entity):
             rendered_lines = []
             
             for line in speech_lines:
-                text_surface = font.render(line, True, (0, 0, 0))
+                text_surface = text_cache.render(font, line, True, (0, 0, 0))
                 rendered_lines.append(text_surface)
                 if text_surface.get_width() > max_line_width:
                     max_line_width = text_surface.get_width()
@@ -375,8 +361,7 @@ class NavalNPC(Entity):
             return
             
         # Create popup similar to minigame result popup
-        font = pygame.font.Font(None, 48)
-        text_surface = font.render(self.popup_message, True, (255, 255, 255))
+        text_surface = text_cache.render(get_font(48), self.popup_message, True, (255, 255, 255))
         
         # Background dimensions
         padding = 30
@@ -409,11 +394,10 @@ class NavalNPC(Entity):
             return
             
         # Create sleek popup for quote display
-        font = pygame.font.Font(None, 64)
+        font = get_font(64)
         
         # Wrap text for better display
-        wrapped_text = textwrap.fill(self.current_quote, width=50)
-        quote_lines = wrapped_text.split('\n')
+        quote_lines = wrap_chars(self.current_quote, 50)
         
         # Calculate dimensions
         line_height = font.get_linesize()
@@ -421,7 +405,7 @@ class NavalNPC(Entity):
         rendered_lines = []
         
         for line in quote_lines:
-            text_surface = font.render(line, True, (255, 255, 255))
+            text_surface = text_cache.render(font, line, True, (255, 255, 255))
             rendered_lines.append(text_surface)
             if text_surface.get_width() > max_line_width:
                 max_line_width = text_surface.get_width()
@@ -454,8 +438,7 @@ class NavalNPC(Entity):
             current_y += line_height
         
         # Draw "Timeless Wisdom" header
-        header_font = pygame.font.Font(None, 40)
-        header_surface = header_font.render("~ Timeless Wisdom ~", True, (255, 215, 0))
+        header_surface = text_cache.render(get_font(40), "~ Timeless Wisdom ~", True, (255, 215, 0))
         header_x = bg_x + (bg_width - header_surface.get_width()) // 2
         header_y = bg_y + 10
         screen.blit(header_surface, (header_x, header_y))
\ No newline at end of file
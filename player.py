@@ -1,16 +1,18 @@
 import pygame
 
 from entity import Entity
+from asset_manager import get_image
 
 class Player(Entity):
     def __init__(self, x, y):
-        super().__init__(x, y, "images/player/rested.png") # Initial image
-        # Load all animation images
-        self.image_rested = pygame.transform.scale(self.image, (128, 128))
-        self.image_up = pygame.transform.scale(pygame.image.load("images/player/walkingUp.png").convert_alpha(), (128, 128))
-        self.image_down = pygame.transform.scale(pygame.image.load("images/player/walkingDown.png").convert_alpha(), (128, 128))
-        self.image_right = pygame.transform.scale(pygame.image.load("images/player/walkingLeftRight.png").convert_alpha(), (128, 128))
-        self.image_left = pygame.transform.flip(pygame.transform.scale(pygame.image.load("images/player/walkingLeftRight.png").convert_alpha(), (128,128)), True, False)
+        player_size = (128, 128)
+        super().__init__(x, y, "images/player/rested.png", player_size) # Initial image
+        # Load all animation images (shared through the asset manager)
+        self.image_rested = self.image
+        self.image_up = get_image("images/player/walkingUp.png", player_size)
+        self.image_down = get_image("images/player/walkingDown.png", player_size)
+        self.image_right = get_image("images/player/walkingLeftRight.png", player_size)
+        self.image_left = get_image("images/player/walkingLeftRight.png", player_size, flip_x=True)
         self.image = self.image_rested # Set initial image after scaling
         self.rect = self.image.get_rect(topleft=(x,y)) # Update rect with scaled image
         self.speed = 5
@@ -78,41 +80,24 @@ class Player(Entity):
             future_x = self.rect.x + dx
             future_y = self.rect.y + dy
 
-            # Check collision at points on the lower half of the player's future rect
+            # Only the lower half of the player's future rect collides
             player_w = self.rect.width
             player_h = self.rect.height
             
-            # Y-coordinates for the lower half
             # The top of the lower half starts at y + height/2
-            # The bottom of the lower half is at y + height - 1
             y_lower_half_top = future_y + player_h // 2
-            y_lower_half_bottom = future_y + player_h - 1
 
             # X-coordinates adjusted for reduced horizontal collision radius
             horizontal_offset = player_w // 3 # 25% offset from each side
             x_collision_left = future_x + horizontal_offset
             x_collision_right = future_x + player_w - 1 - horizontal_offset
-            x_center = future_x + player_w // 2 # Original center
-            
-            # If any of these points on the lower half collide, stop movement.
-            # Point 1: Bottom-left of the player (adjusted)
-            if not collision_check_func(x_collision_left, y_lower_half_bottom):
-                dx, dy = 0, 0
-            # Point 2: Bottom-right of the player (adjusted)
-            elif not collision_check_func(x_collision_right, y_lower_half_bottom):
-                dx, dy = 0, 0
-            # Point 3: Center of the bottom edge (important for small obstacles/platforms)
-            elif not collision_check_func(x_center, y_lower_half_bottom):
-                dx, dy = 0, 0
-            # Point 4: Top-left of the *lower half* of the player (adjusted)
-            elif not collision_check_func(x_collision_left, y_lower_half_top):
-                dx, dy = 0, 0
-            # Point 5: Top-right of the *lower half* of the player (adjusted)
-            elif not collision_check_func(x_collision_right, y_lower_half_top):
+
+            # collision_check_func checks every tile under the footprint rect in one call
+            footprint = pygame.Rect(x_collision_left, y_lower_half_top,
+                                    x_collision_right - x_collision_left + 1,
+                                    player_h - player_h // 2)
+            if not collision_check_func(footprint):
                 dx, dy = 0, 0
-            # (Optional) Point 6: Center of the top edge of the *lower half*
-            # elif not collision_check_func(x_center, y_lower_half_top):
-            #    dx, dy = 0, 0
 
         # Apply movement if no collision
         self.rect.x += dx
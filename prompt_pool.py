@@ -0,0 +1,71 @@
+import threading
+from collections import deque
+
+# Generated results kept ready per prompt
+DEFAULT_POOL_SIZE = 3
+
+
+class PromptPool:
+    """
+    A small pool of ready results of one generator function (one fixed prompt), topped up in the background.
+
+    take() returns a ready result instantly or None when the pool is empty, and starts a refill either
+    way. A single worker refills one result at a time, so a pool never has more than one request in
+    flight. A failed generation stops the refill until the next take().
+    """
+    def __init__(self, generate_func, size=DEFAULT_POOL_SIZE, failure_value=None, name=None):
+        self.generate_func = generate_func
+        self.size = size
+        self.failure_value = failure_value  # What generate_func returns when it fails
+        self.name = name or generate_func.__name__
+        self.ready = deque()
+        self._lock = threading.Lock()
+        self._refill_thread = None
+
+        # Statistics
+        self.served_from_pool = 0
+        self.pool_misses = 0
+
+    def is_valid(self, result):
+        return bool(result) and result != self.failure_value
+
+    def fill(self):
+        """Starts the background refill if the pool isn't full and no refill is running."""
+        with self._lock:
+            if len(self.ready) >= self.size:
+                return
+            if self._refill_thread and self._refill_thread.is_alive():
+                return
+            self._refill_thread = threading.Thread(target=self._refill, name=f"prompt-pool-{self.name}")
+            self._refill_thread.daemon = True
+            self._refill_thread.start()
+
+    def _refill(self):
+        while True:
+            with self._lock:
+                if len(self.ready) >= self.size:
+                    return
+            try:
+                result = self.generate_func()
+            except Exception as e:
+                print(f"PromptPool '{self.name}': generation failed: {e}")
+                return
+            if not self.is_valid(result):
+                print(f"PromptPool '{self.name}': generation failed, refilling again on next use")
+                return
+            with self._lock:
+                self.ready.append(result)
+
+    def take(self):
+        """Returns a ready result (oldest first) or None if the pool is empty. Refills in the background."""
+        with self._lock:
+            result = self.ready.popleft() if self.ready else None
+        if result is None:
+            self.pool_misses += 1
+        else:
+            self.served_from_pool += 1
+        self.fill()
+        return result
+
+    def __len__(self):
+        return len(self.ready)
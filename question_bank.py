@@ -0,0 +1,110 @@
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+QUESTION_COLLECTION = 'ai_questions'
+# Used if the collection can't be listed (the question IDs the game started with)
+FALLBACK_QUESTION_IDS = ["1", "2"]
+# How many upcoming questions of a player's bag are read ahead of time
+PREFETCH_COUNT = 3
+MAX_CACHED_QUESTIONS = 500
+
+
+class QuestionBank:
+    """
+    Serves quiz questions from memory in a no-repeat shuffled order per player.
+
+    The collection's document IDs are discovered once in the background. Each player (None when
+    signed out) draws from their own shuffle bag, which is refilled and reshuffled when empty, and the
+    next few documents of that bag are read by background workers before they are needed.
+    """
+    def __init__(self, db_handler, collection_name=QUESTION_COLLECTION, prefetch_count=PREFETCH_COUNT):
+        self.db_handler = db_handler
+        self.collection_name = collection_name
+        self.prefetch_count = prefetch_count
+
+        self.question_ids = None  # Set once discovery finishes
+        self.bags = {}  # {username: [question_id, ...]}, the next question is at the end
+        self.last_question_ids = {}  # {username: question_id} so a refilled bag doesn't start with a repeat
+        self.documents = OrderedDict()  # {question_id: question document}
+        self._pending_reads = {}  # {question_id: Future}
+        self._lock = threading.Lock()
+
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="question-bank")
+        self._discovery = self.executor.submit(self._discover_question_ids)
+
+    def _discover_question_ids(self):
+        question_ids = self.db_handler.list_document_ids(self.collection_name)
+        if not question_ids:
+            print(f"QuestionBank: could not list '{self.collection_name}', using fallback question IDs")
+            question_ids = list(FALLBACK_QUESTION_IDS)
+        self.question_ids = question_ids
+        print(f"QuestionBank: found {len(question_ids)} questions in '{self.collection_name}'")
+        return question_ids
+
+    def _get_bag(self, username):
+        bag = self.bags.get(username)
+        if not bag:
+            question_ids = self.question_ids if self.question_ids is not None else self._discovery.result()
+            bag = list(question_ids)
+            random.shuffle(bag)
+            # Avoid asking the question that ended the previous bag again straight away
+            if len(bag) > 1 and bag[-1] == self.last_question_ids.get(username):
+                bag[0], bag[-1] = bag[-1], bag[0]
+            self.bags[username] = bag
+        return bag
+
+    def prefetch(self, username=None):
+        """Starts background reads of the player's next few questions (call it when a quiz is likely)."""
+        if self.question_ids is None and not self._discovery.done():
+            return  # Discovery still running, the next call will prefetch
+        bag = self._get_bag(username)
+        for question_id in bag[-self.prefetch_count:]:
+            self._read_in_background(question_id)
+
+    def _read_in_background(self, question_id):
+        with self._lock:
+            if question_id in self.documents or question_id in self._pending_reads:
+                return None
+            future = self.executor.submit(self._read_question, question_id)
+            self._pending_reads[question_id] = future
+            return future
+
+    def _read_question(self, question_id):
+        try:
+            question_doc = self.db_handler.read_document(self.collection_name, question_id)
+            if question_doc:
+                with self._lock:
+                    self.documents[question_id] = question_doc
+                    if len(self.documents) > MAX_CACHED_QUESTIONS:
+                        self.documents.popitem(last=False)
+            return question_doc
+        finally:
+            with self._lock:
+                self._pending_reads.pop(question_id, None)
+
+    def next_question(self, username=None):
+        """
+        Returns (question_id, question_doc) for the player's next question, or (None, None).
+        Served from memory when prefetched, otherwise the read happens now.
+        """
+        bag = self._get_bag(username)
+        question_id = bag.pop()
+        self.last_question_ids[username] = question_id
+
+        with self._lock:
+            question_doc = self.documents.get(question_id)
+            pending_read = self._pending_reads.get(question_id)
+        if question_doc is None:
+            if pending_read:
+                question_doc = pending_read.result()
+            else:
+                print(f"QuestionBank: question {question_id} was not prefetched, reading it now")
+                question_doc = self._read_question(question_id)
+
+        # Keep the following questions ready
+        self.prefetch(username)
+        if question_doc is None:
+            return None, None
+        return question_id, question_doc
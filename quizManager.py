@@ -1,16 +1,33 @@
 import pygame
 import random
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 from databaseHandler import DatabaseHandler
+from text_cache import get_font
+from text_layout import wrap_text
+from answer_grader import AnswerPreGrader
+from grade_cache import GradeCache
+from question_bank import QuestionBank
+from llm_cache import llm_cache
+from llm_backend import get_backend
+from llm_guard import GuardRejectedError
+
+# Seconds to wait for the AI's grading before giving up on it
+GRADING_TIMEOUT_SECONDS = 20
+# Share of locally graded answers that are also sent to the AI in the background to measure agreement
+PRE_GRADER_AUDIT_RATE = 0.2
+
+QUIZ_MODEL_NAME = 'gemini-2.0-flash-lite'
+QUIZ_SYSTEM_INSTRUCTION = "You are an AI teacher evaluating student answers. You should be helpful but fair in your evaluation. Use your knowledge to make sure the response makes sense and is logical in its context. Keep responses concise and educational."
 
 class QuizManager:
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, grading_timeout=GRADING_TIMEOUT_SECONDS):
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.is_active = False
         self.current_question = None
+        self.current_question_id = None
         self.player_answer = ""
         self.evaluating = False
         self.quiz_result = None
@@ -18,12 +35,30 @@ class QuizManager:
         self.show_result_popup = False
         self.attempt_count = 0
         self.max_attempts = 3
+
+        # Grading runs on a single worker (the chat session isn't thread-safe), update() polls the future
+        self.grading_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="quiz-grader")
+        self.grading_future = None  # Future of the answer being graded, None once handled or discarded
+        self.grading_started_at = 0
+        self.grading_timeout = grading_timeout
+
+        # Clear-cut answers are graded locally without an AI call
+        self.pre_grader = AnswerPreGrader()
+        self.pre_grader_audit_rate = PRE_GRADER_AUDIT_RATE
+        # Audits are one-shot calls on their own worker, so they never delay a real grade or join the grading chat
+        self.audit_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="quiz-audit")
+        self.audit_future = None
+        # AI verdicts for answers already graded, persisted between runs
+        self.grade_cache = GradeCache()
+        self.grading_request = None  # (question_id, answer) of the answer being graded by the AI
           # Initialize database handler
         try:
             self.db_handler = DatabaseHandler()
         except Exception as e:
             print(f"Failed to initialize database handler: {e}")
             self.db_handler = None
+        # Questions are discovered and read ahead in the background so a quiz opens from memory
+        self.question_bank = QuestionBank(self.db_handler) if self.db_handler else None
         
         # Initialize continuous API chat
         self.chat_session = None
@@ -40,10 +75,10 @@ class QuizManager:
         
         # Font setup
         pygame.font.init()
-        self.title_font = pygame.font.Font(None, 48)
-        self.question_font = pygame.font.Font(None, 32)
-        self.input_font = pygame.font.Font(None, 30)
-        self.button_font = pygame.font.Font(None, 36)
+        self.title_font = get_font(48)
+        self.question_font = get_font(32)
+        self.input_font = get_font(30)
+        self.button_font = get_font(36)
         
         # Layout
         self.popup_width = min(800, screen_width - 100)
@@ -56,37 +91,28 @@ class QuizManager:
         self.failure_callback = None
     
     def _init_api(self):
-        """Initialize the Google Generative AI API for continuous chat"""
+        """Start the continuous grading chat on the configured model backend"""
         try:
-            load_dotenv()
-            google_api_key = os.getenv("GOOGLE_API_KEY")
-            
-            if not google_api_key:
-                print("Error: GOOGLE_API_KEY not found in .env file")
-                return False
-            
-            genai.configure(api_key=google_api_key)
-            
-            model = genai.GenerativeModel(
-                model_name='gemini-2.0-flash-lite',
-                system_instruction="You are an AI teacher evaluating student answers. You should be helpful but fair in your evaluation. Use your knowledge to make sure the response makes sense and is logical in its context. Keep responses concise and educational."
-            )
-            
-            self.chat_session = model.start_chat(history=[])
+            self.chat_session = get_backend().start_chat(QUIZ_MODEL_NAME, QUIZ_SYSTEM_INSTRUCTION)
             return True
             
         except Exception as e:
             print(f"Error initializing quiz API: {e}")
             return False
     
-    def start_quiz(self, collectible_points=1):
-        """Start a new quiz with a random question"""
+    def prefetch_questions(self, username=None):
+        """Reads the player's next questions in the background (call when a quiz is likely to start)"""
+        if self.question_bank:
+            self.question_bank.prefetch(username)
+
+    def start_quiz(self, collectible_points=1, username=None):
+        """Start a new quiz with the player's next question"""
         if not self.db_handler or not self.chat_session:
             print("Quiz system not properly initialized")
             return False
         
         # Fetch random question from database
-        question_data = self._fetch_random_question()
+        question_data = self._fetch_random_question(username)
         if not question_data:
             print("Failed to fetch question from database")
             return False
@@ -103,18 +129,12 @@ class QuizManager:
         print(f"Quiz started! Question: {question_data.get('question_text', 'No question text')}")
         return True
     
-    def _fetch_random_question(self):
-        """Fetch a random question from the ai_questions collection"""
+    def _fetch_random_question(self, username=None):
+        """Takes the player's next question from the question bank's shuffle bag"""
         try:
-            # Get a random question ID (1-30)
-            #question_id = str(random.randint(1, 30))
-            #question_id = "1"
-            question_id = str(random.randint(1, 2))
-            
-
-            # Read the question document
-            question_doc = self.db_handler.read_document('ai_questions', question_id)
+            question_id, question_doc = self.question_bank.next_question(username)
             if question_doc:
+                self.current_question_id = question_id
                 print(f"Fetched question ID {question_id}: {question_doc.get('question_text', 'No text')}")
                 return question_doc
             else:
@@ -153,6 +173,10 @@ class QuizManager:
             return True  # Consume all events during result popup
             
         if self.evaluating:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                # Leaving while the AI grades: its answer will be discarded when it arrives
+                self._close_quiz(False)
+                return True
             return False
             
         if event.type == pygame.KEYDOWN:
@@ -185,24 +209,116 @@ class QuizManager:
         self.attempt_count += 1
         
         # Create evaluation prompt
-        prompt = f"""Evaluate if the player's answer is correct for the given question. Use the expected keywords, as well as your knowledge as an AI, to evaluate the answer.
-Question: '{self.current_question.get('question_text', '')}'
-Expected Concepts: '{self.current_question.get('answer_keywords', '')}'
-Player's Answer: '{self.player_answer}'
-Please respond with 'CORRECT' if the answer is sufficiently accurate, otherwise 'INCORRECT'. You can consider synonyms and related concepts. If 'CORRECT', optionally follow up a brief reason why. If 'INCORRECT', follow up with clear hints towards the correct answer, but do not reveal the full answer."""
+        prompt = self._build_grading_prompt()
         
+        # The same (or a near-identical) answer was graded by the AI before
+        cached_response = self.grade_cache.get(self.current_question_id, self.player_answer)
+        if cached_response is not None:
+            print(f"DEBUG: Using cached grade ({self.grade_cache.hits} cache hits so far)")
+            self._process_ai_response(cached_response)
+            return
+
+        # Clear cases are graded locally, only borderline answers need the AI
+        pre_grade = self.pre_grader.grade(self.current_question, self.player_answer)
+        self.pre_grader.print_stats()
+        if pre_grade["verdict"]:
+            print(f"DEBUG: Graded locally as {pre_grade['verdict']} (keyword coverage {pre_grade['coverage']:.0%})")
+            if random.random() < self.pre_grader_audit_rate:
+                self._audit_local_grade(prompt, pre_grade["verdict"])
+            self._process_ai_response(f"{pre_grade['verdict']}\n{pre_grade['message']}")
+            return
+
         print(f"DEBUG: Sending prompt to AI: {prompt[:200]}...")
-    
+
+        # The evaluating screen keeps drawing while the worker waits for the AI, update() picks up the result
+        self.grading_started_at = time.monotonic()
+        self.grading_request = (self.current_question_id, self.player_answer)
+        self.grading_future = self.grading_executor.submit(self._grade_answer, prompt)
+
+    def _build_grading_prompt(self):
+        """Grading prompt for the current answer, using the question's pre-generated rubric if it has one"""
+        question = self.current_question
+        rubric = question.get('rubric')
+        if not rubric:
+            return f"""Evaluate if the player's answer is correct for the given question. Use the expected keywords, as well as your knowledge as an AI, to evaluate the answer.
+Question: '{question.get('question_text', '')}'
+Expected Concepts: '{question.get('answer_keywords', '')}'
+Player's Answer: '{self.player_answer}'
+Please respond with 'CORRECT' if the answer is sufficiently accurate, otherwise 'INCORRECT'. You can consider synonyms and related concepts. If 'CORRECT', optionally follow up a brief reason why. If 'INCORRECT', follow up with clear hints towards the correct answer, but do not reveal the full answer."""
+
+        # The hints come from the question's hint ladder, so the AI only has to judge the answer
+        return f"""Evaluate if the player's answer is correct for the given question using the grading rubric, as well as your knowledge as an AI.
+Question: '{question.get('question_text', '')}'
+Key Points: '{', '.join(rubric.get('key_points', []))}'
+Correct If: '{rubric.get('correct_if', '')}'
+Common Mistakes: '{', '.join(rubric.get('common_mistakes', []))}'
+Player's Answer: '{self.player_answer}'
+Please respond with 'CORRECT' if the answer is sufficiently accurate, otherwise 'INCORRECT'. You can consider synonyms and related concepts. Follow up with one short sentence explaining your verdict, but do not reveal the full answer."""
+
+    def _get_ladder_hint(self):
+        """The pre-generated hint for the attempt just made (stronger on each attempt), or None"""
+        hints = self.current_question.get('hints') if self.current_question else None
+        if not hints:
+            return None
+        return hints[min(self.attempt_count, len(hints)) - 1]
+
+    def _audit_local_grade(self, prompt, local_verdict):
+        """Also asks the AI in the background, only to log whether it agrees with the local verdict"""
+        if self.audit_future and not self.audit_future.done():
+            return  # One audit at a time is plenty for a sample
+        def record(future):
+            try:
+                self.pre_grader.record_audit(local_verdict, future.result())
+            except Exception as e:
+                print(f"DEBUG: Pre-grader audit failed: {e}")
+        self.audit_future = self.audit_executor.submit(self._audit_answer, prompt)
+        self.audit_future.add_done_callback(record)
+
+    def _audit_answer(self, prompt):
+        """Runs on the audit worker: a one-shot call without the grading chat's history"""
+        return llm_cache.call(QUIZ_MODEL_NAME, None, prompt, lambda: get_backend().generate(QUIZ_MODEL_NAME, prompt))
+
+    def _grade_answer(self, prompt):
+        """Runs on the grading worker: sends the prompt to the continuous chat session"""
+        # Grading prompts are self-contained, so they are cached by the prompt alone, not the session's history
+        return llm_cache.call(QUIZ_MODEL_NAME, QUIZ_SYSTEM_INSTRUCTION, prompt,
+                              lambda: self.chat_session.send_message(prompt).text)
+
+    def _replace_grading_worker(self):
+        """The hung call keeps its worker and chat session, so the retry gets new ones it can't block"""
+        self.grading_executor.shutdown(wait=False)
+        self.grading_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="quiz-grader")
+        self._init_api()
+
+    def _poll_grading(self):
+        """Handles the grading result once it is ready, or gives up after grading_timeout seconds"""
+        future = self.grading_future
+        if not future.done():
+            if time.monotonic() - self.grading_started_at >= self.grading_timeout:
+                print(f"DEBUG: Grading timed out after {self.grading_timeout}s")
+                self.grading_future = None  # The late result will be ignored
+                self._replace_grading_worker()
+                self.evaluating = False
+                self.attempt_count -= 1  # Not the player's fault, this attempt doesn't count
+                self.quiz_result = "The teacher is taking too long to answer. Please try again."
+                self._show_result_popup()
+            return
+
+        self.grading_future = None
         try:
-            # Send to continuous chat session
-            response = self.chat_session.send_message(prompt)
-            ai_response = response.text
-    
+            ai_response = future.result()
             print(f"DEBUG: AI Response received: '{ai_response}'")
+            self.grade_cache.put(*self.grading_request, ai_response)
 
             # Process the AI response
             self._process_ai_response(ai_response)
             
+        except GuardRejectedError as e:
+            print(f"DEBUG: Grading not sent: {e}")
+            self.evaluating = False
+            self.attempt_count -= 1  # Not the player's fault, this attempt doesn't count
+            self.quiz_result = "The teacher is taking a short break. Please try again in a moment."
+            self._show_result_popup()
         except Exception as e:
             print(f"DEBUG: Error in _submit_answer: {e}")
             self.evaluating = False
@@ -240,7 +356,9 @@ Please respond with 'CORRECT' if the answer is sufficiently accurate, otherwise
             else:
                 # Give feedback and allow retry
                 attempts_left = self.max_attempts - self.attempt_count
-                self.quiz_result = f"Incorrect. {attempts_left} attempt(s) remaining.\n\n{ai_response}\n\nTry again!"
+                hint = self._get_ladder_hint()
+                feedback = f"{ai_response}\n\nHint: {hint}" if hint else ai_response
+                self.quiz_result = f"Incorrect. {attempts_left} attempt(s) remaining.\n\n{feedback}\n\nTry again!"
                 self._show_result_popup()
                 # Don't close quiz, allow player to try again
     
@@ -252,13 +370,20 @@ Please respond with 'CORRECT' if the answer is sufficiently accurate, otherwise
         """Update quiz state"""
         if not self.is_active:
             return        # Handle result popup timeout
+
+        if self.evaluating and self.grading_future:
+            self._poll_grading()
     
     def _close_quiz(self, success=False):
         """Close the quiz"""
         self.is_active = False
         self.current_question = None
+        self.current_question_id = None
         self.player_answer = ""
         self.evaluating = False
+        if self.grading_future and not self.grading_future.done():
+            self._replace_grading_worker()  # The next quiz mustn't queue behind the abandoned call
+        self.grading_future = None  # Discard a grading result that is still on its way
         self.quiz_result = None
         self.show_result_popup = False
         self.attempt_count = 0
@@ -305,7 +430,7 @@ Please respond with 'CORRECT' if the answer is sufficiently accurate, otherwise
         # Question text with wrapping
         if self.current_question:
             question_text = self.current_question.get('question_text', 'No question available')
-            wrapped_lines = self._wrap_text(question_text, self.question_font, self.popup_width - 40)
+            wrapped_lines = wrap_text(question_text, self.question_font, self.popup_width - 40)
             
             for line in wrapped_lines:
                 line_surface = self.question_font.render(line, True, self.text_color)
@@ -328,7 +453,7 @@ Please respond with 'CORRECT' if the answer is sufficiently accurate, otherwise
         
         # Wrap and render input text
         if self.player_answer:
-            wrapped_input_lines = self._wrap_text(self.player_answer, self.input_font, input_box_width - 20)
+            wrapped_input_lines = wrap_text(self.player_answer, self.input_font, input_box_width - 20)
             
             line_y = y_offset + 8
             for i, line in enumerate(wrapped_input_lines):
@@ -345,7 +470,7 @@ Please respond with 'CORRECT' if the answer is sufficiently accurate, otherwise
         
         # Cursor (show on last visible line)
         if self.player_answer:
-            wrapped_input_lines = self._wrap_text(self.player_answer, self.input_font, input_box_width - 20)
+            wrapped_input_lines = wrap_text(self.player_answer, self.input_font, input_box_width - 20)
             if wrapped_input_lines:
                 # Calculate cursor position on the last visible line
                 visible_lines = min(len(wrapped_input_lines), 
@@ -394,6 +519,17 @@ Please respond with 'CORRECT' if the answer is sufficiently accurate, otherwise
         loading_x = (self.popup_width - loading_text.get_width()) // 2
         loading_y = title_y + title_text.get_height() + 20
         surface.blit(loading_text, (loading_x, loading_y))
+
+        # Spinner: a quarter arc turning once per second
+        spinner_radius = 22
+        spinner_rect = pygame.Rect(0, 0, spinner_radius * 2, spinner_radius * 2)
+        spinner_rect.center = (self.popup_width // 2, title_y - spinner_radius - 20)
+        start_angle = -(pygame.time.get_ticks() % 1000) / 1000 * 2 * math.pi
+        pygame.draw.circle(surface, (70, 70, 90), spinner_rect.center, spinner_radius, 4)
+        pygame.draw.arc(surface, self.border_color, spinner_rect, start_angle, start_angle + math.pi / 2, 4)
+
+        escape_text = self.input_font.render("Press ESC to leave", True, (150, 150, 150))
+        surface.blit(escape_text, ((self.popup_width - escape_text.get_width()) // 2, self.popup_height - 40))
     
     def _draw_result_popup(self, surface):
         """Draw the result popup with AI feedback"""
@@ -429,7 +565,7 @@ Please respond with 'CORRECT' if the answer is sufficiently accurate, otherwise
         for paragraph in paragraphs:
             if paragraph.strip():  # Skip empty paragraphs
                 # Wrap each paragraph individually
-                wrapped_lines = self._wrap_text(paragraph, self.question_font, self.popup_width - 40)
+                wrapped_lines = wrap_text(paragraph, self.question_font, self.popup_width - 40)
                 
                 for line in wrapped_lines:
                     line_surface = self.question_font.render(line, True, self.text_color)
@@ -448,27 +584,6 @@ Please respond with 'CORRECT' if the answer is sufficiently accurate, otherwise
         continue_surface = self.input_font.render(continue_text, True, (150, 150, 150))
         continue_x = (self.popup_width - continue_surface.get_width()) // 2
         surface.blit(continue_surface, (continue_x, self.popup_height - 40))    
-    def _wrap_text(self, text, font, max_width):
-        """Wrap text to fit within max_width"""
-        words = text.split(' ')
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            if font.size(test_line)[0] <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                    current_line = word
-                else:
-                    lines.append(word)  # Word too long, add anyway
-        
-        if current_line:
-            lines.append(current_line)
-        
-        return lines
     
     def set_callbacks(self, completion_callback, failure_callback):
         """Set callbacks for quiz completion/failure"""
@@ -1,5 +1,7 @@
 import pygame
 from databaseHandler import DatabaseHandler
+from text_cache import get_font
+from text_layout import wrap_text
 
 class QuoteTracker:
     def __init__(self):
@@ -35,10 +37,10 @@ class QuoteTracker:
         self.quote_border_color = (150, 150, 150)
         
         # Fonts
-        self.title_font = pygame.font.Font(None, 48)
-        self.quote_font = pygame.font.Font(None, 30)
-        self.number_font = pygame.font.Font(None, 32)
-        self.progress_font = pygame.font.Font(None, 36)
+        self.title_font = get_font(48)
+        self.quote_font = get_font(30)
+        self.number_font = get_font(32)
+        self.progress_font = get_font(36)
         
         # Layout
         self.popup_width = 900
@@ -256,7 +258,7 @@ class QuoteTracker:
             if quote_id in self._cached_quote_data:
                 quote_text = self._cached_quote_data[quote_id]
                 # Wrap text to fit in box
-                wrapped_lines = self._wrap_text(quote_text, self.quote_font, width - 80)
+                wrapped_lines = wrap_text(quote_text, self.quote_font, width - 80)
                 
                 text_y = y + 15
                 for line in wrapped_lines[:2]:  # Show max 2 lines
@@ -279,28 +281,6 @@ class QuoteTracker:
         return y + height
 
     
-    def _wrap_text(self, text, font, max_width):
-        """Wrap text to fit within max_width"""
-        words = text.split(' ')
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            if font.size(test_line)[0] <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                    current_line = word
-                else:
-                    lines.append(word)  # Word too long, add anyway
-        
-        if current_line:
-            lines.append(current_line)
-        
-        return lines
-
     # Keep existing methods for backward compatibility
     def print_quote_status(self, username):
         """Print locked and unlocked quotes to console for MVP"""
@@ -1,5 +1,6 @@
 import pygame
-from databaseHandler import FirestoreHandler, SERVICE_ACCOUNT_KEY_PATH
+from databaseHandler import get_firestore_handler
+from text_cache import get_font, render_text
 
 class SettingsManager:
     def __init__(self, screen_width, screen_height):
@@ -38,10 +39,10 @@ class SettingsManager:
         
         # Fonts
         pygame.font.init()
-        self.button_font = pygame.font.Font(None, 32)
-        self.popup_title_font = pygame.font.Font(None, 48)
-        self.popup_button_font = pygame.font.Font(None, 38)
-        self.input_font = pygame.font.Font(None, 26)
+        self.button_font = get_font(32)
+        self.popup_title_font = get_font(48)
+        self.popup_button_font = get_font(38)
+        self.input_font = get_font(26)
         
         # Mouse state
         self.mouse_pos = (0, 0)
@@ -60,32 +61,29 @@ class SettingsManager:
         
         # Status display properties
         self.current_username = None  # Store current signed-in username
-        self.status_font = pygame.font.Font(None, 28)
+        self.status_font = get_font(28)
         self.status_bg_color_signed_in = (40, 80, 40, 180)  # Faint green with transparency
         self.status_bg_color_signed_out = (80, 40, 40, 180)  # Faint red with transparency
         self.status_text_color = (255, 255, 255)
 
         # Save status box properties
         self.save_status_box_size = 45
-        self.save_status_hover_font = pygame.font.Font(None, 28)
+        self.save_status_hover_font = get_font(28)
 
         # Error message display properties
         self.error_message = None
         self.error_message_start_time = 0
         self.error_display_duration = 4000  # 4 seconds in milliseconds
-        self.error_font = pygame.font.Font(None, 24)
+        self.error_font = get_font(24)
         self.error_bg_color = (80, 40, 40, 200)  # Faint red with transparency
         self.error_text_color = (255, 255, 255)
 
         self.auto_save_enabled = True  # Default to enabled
-        
-        # Initialize database handler
-        try:
-            self.db_handler = FirestoreHandler(SERVICE_ACCOUNT_KEY_PATH)
-            print("Database handler initialized successfully")
-        except Exception as e:
-            print(f"Failed to initialize database handler: {e}")
-            self.db_handler = None
+
+    @property
+    def db_handler(self):
+        """The shared database handler, connected on first use (None if that failed)"""
+        return get_firestore_handler()
     
     def update_mouse_state(self, mouse_pos, mouse_clicked):
         """Update mouse position and click state"""
@@ -409,7 +407,7 @@ class SettingsManager:
 
         # Draw close instruction
         close_text = "Click ESC or outside of the pop-up to close"
-        close_surface = pygame.font.Font(None, 26).render(close_text, True, (150, 150, 150))
+        close_surface = render_text(close_text, 26, (150, 150, 150))
         close_rect = close_surface.get_rect(centerx=current_popup_rect.centerx, 
                                           y=current_popup_rect.bottom - 30)
         screen.blit(close_surface, close_rect)
@@ -498,7 +496,7 @@ class SettingsManager:
         
         # Draw instructions
         instruction_text = "Press Enter to submit, Tab to switch fields, Esc to cancel"
-        instruction_surface = pygame.font.Font(None, 18).render(instruction_text, True, (150, 150, 150))
+        instruction_surface = render_text(instruction_text, 18, (150, 150, 150))
         instruction_rect = instruction_surface.get_rect(centerx=popup_rect.centerx, y=submit_button_y + 50)
         screen.blit(instruction_surface, instruction_rect)
         
@@ -0,0 +1,90 @@
+import os
+import re
+import subprocess
+import sys
+import time
+
+# Game modules whose import cost is measured one by one, each in a fresh interpreter
+GAME_MODULES = ["pygame", "tilemap", "mapManager", "databaseHandler", "settings_manager", "llm_backend",
+                "staticAPI", "wizard", "mysterious_rect", "wizardChatManager", "quizManager"]
+# The SDKs the game now imports on first use, for comparison (skipped when not installed)
+SDK_MODULES = ["google.genai", "google.generativeai", "firebase_admin"]
+TOP_IMPORTS = 15
+RUNS = 3
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_imports(module_name):
+    """
+    Imports module_name in a fresh interpreter with -X importtime. Returns the cumulative microseconds and
+    [(self_us, cumulative_us, module), ...] of every module it imported, or None if the import failed.
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    imports = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        imports.append((self_us, cumulative_us, name))
+        if name == module_name and len(indent) == 1:
+            total_us = cumulative_us
+    return total_us, imports
+
+
+def time_first_frame():
+    """Runs the game until its first frame is on screen. Returns (window ms, first frame ms, process ms), or None."""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", STARTUP_BENCHMARK="1")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "main.py"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    window_ms = re.search(r"Startup: window shown after (\d+) ms", result.stdout)
+    frame_ms = re.search(r"Startup: first frame shown after (\d+) ms", result.stdout)
+    if not frame_ms:
+        print(result.stdout[-2000:])
+        print(result.stderr[-2000:])
+        return None
+    return int(window_ms.group(1)), int(frame_ms.group(1)), wall_ms
+
+
+def main():
+    print(f"Import times (best of {RUNS} runs, each in a fresh interpreter)")
+    print(f"{'module':<24}{'cumulative':>14}")
+    heaviest = {}
+    for module_name in GAME_MODULES + SDK_MODULES:
+        measurements = [measure_imports(module_name) for _ in range(RUNS)]
+        if any(measurement is None for measurement in measurements):
+            print(f"{module_name:<24}{'not importable here':>22}")
+            continue
+        total_us, imports = min(measurements, key=lambda measurement: measurement[0])
+        label = module_name + (" (SDK)" if module_name in SDK_MODULES else "")
+        print(f"{label:<24}{total_us / 1000:>11.1f} ms")
+        if module_name in GAME_MODULES:
+            for self_us, _, name in imports:
+                heaviest[name] = max(heaviest.get(name, 0), self_us)
+
+    print()
+    print("Heaviest single imports of the game modules (self time, -X importtime)")
+    for name, self_us in sorted(heaviest.items(), key=lambda item: item[1], reverse=True)[:TOP_IMPORTS]:
+        print(f"  {name:<40}{self_us / 1000:>8.1f} ms")
+
+    print()
+    frame_times = [time_first_frame() for _ in range(RUNS)]
+    frame_times = [frame_time for frame_time in frame_times if frame_time]
+    if not frame_times:
+        print("Could not start main.py")
+        return
+    window_ms, frame_ms, wall_ms = min(frame_times, key=lambda frame_time: frame_time[1])
+    print(f"main.py: window after {window_ms} ms, first frame after {frame_ms} ms, process done after {wall_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
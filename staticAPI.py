@@ -1,11 +1,10 @@
-from google import genai
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-google_api_key = os.getenv("GOOGLE_API_KEY")
-
-client = genai.Client(api_key = google_api_key)
+from prompt_pool import PromptPool
+from llm_executor import LLMExecutor
+from llm_cache import llm_cache
+from llm_backend import get_backend
+from llm_policy import RequestPolicy, request_policy
+from llm_guard import GuardRejectedError
+import random
 
 
 #reponse2 = client.models.generate_content(
@@ -15,58 +14,112 @@ client = genai.Client(api_key = google_api_key)
 #print("Response from the model:")
 #print(reponse2.text)
 
+# If the primary model is slower than its p90, the same prompt also goes to the fallback model
+PHILOSOPHY_QUESTION_POLICY = RequestPolicy("gemini-2.0-flash", fallback_model="gemini-2.0-flash-lite")
+AI_QUESTION_POLICY = RequestPolicy("gemma-3-4b-it", fallback_model="gemini-2.0-flash-lite")
+
+# Served while the model guard pauses API calls, so the NPCs still have something to say
+OFFLINE_PHILOSOPHY_QUESTIONS = [
+    "If an AI could remember everything you ever told it, what would you still keep to yourself?",
+    "Would you trust a machine that is always right but can never explain why?",
+    "If AI does all the work one day, what will people spend their lives on?",
+    "Can something that never feels tired or afraid truly understand you?",
+]
+OFFLINE_AI_QUESTIONS = [
+    "What does the attention mechanism let a transformer do?",
+    "Why do AI models need so much compute to train?",
+    "What is a mixture of experts model?",
+    "Why can an AI sound confident and still be wrong?",
+]
+
+
+def _generate(policy, contents, reuse=True):
+    """Generates under the request policy, through the shared response cache and model backend."""
+    answered_by = {}
+
+    def generate():
+        backend = get_backend()  # Raises before any request is sent if the model features are disabled
+        model_name, response_text = request_policy.call(
+            policy, lambda model_name: (model_name, backend.generate(model_name, contents)))
+        answered_by["model"] = model_name
+        return response_text
+    # A response from the hedged fallback model is cached as that model's, not the primary's
+    return llm_cache.call(policy.model_name, None, contents, generate, reuse=reuse,
+                          answered_by=lambda: answered_by["model"])
 
 
 def generate_text_from_input(prompt_text: str, model_name: str = "gemini-2.0-flash"):
     """Generates text using the specified model and prompt."""
     try:
-        response = client.models.generate_content(
-            model=model_name,
-            contents=prompt_text,
-        )
+        response_text = _generate(RequestPolicy(model_name), prompt_text)
         print("the response is:")
-        print(response.text)
-        return response.text
+        print(response_text)
+        return response_text
     except Exception as e:
         print(f"Error generating text: {e}")
         return "Could not generate text."
 
 
+def generate_philosophy_question():
+    """Generates a new philosophy question, raising on errors (the question pool refills with this)."""
+    # A new question every time, so never served from the cache outside replay mode
+    return _generate(
+        PHILOSOPHY_QUESTION_POLICY,
+        #"gemini-2.5-flash-preview-05-20",
+        "You are a philosophically inclined AI enthusiast who thinks a very hard about the future and AI. Ask me one deep question that will make me think about the future, AI, humanity or a combination. Keep the language simple. The question should be short and persuasive.",
+        #"You're a world-class comedian. You're currently standing on a stage at a comedy show in front of 2500 people. Tell the audience a short joke about Google.",
+        reuse=False)
+
+
 def get_philosophy_question():
     """Generates and returns a short joke about Google."""
     try:
-        response1 = client.models.generate_content(
-            model="gemini-2.0-flash",
-            #model="gemini-2.5-flash-preview-05-20",
-            contents="You are a philosophically inclined AI enthusiast who thinks a very hard about the future and AI. Ask me one deep question that will make me think about the future, AI, humanity or a combination. Keep the language simple. The question should be short and persuasive.",
-            #contents="You're a world-class comedian. You're currently standing on a stage at a comedy show in front of 2500 people. Tell the audience a short joke about Google.",
-)
-        return response1.text
+        return generate_philosophy_question()
+    except GuardRejectedError as e:
+        print(f"Not generating a joke: {e}")
+        return random.choice(OFFLINE_PHILOSOPHY_QUESTIONS)
     except Exception as e:
         print(f"Error generating joke: {e}")
         return "Could not fetch a joke."
 
+
+def generate_AI_question():
+    """Generates a new question about AI, raising on errors (the question pool refills with this)."""
+    response_text = _generate(
+        AI_QUESTION_POLICY,
+        "You are a philosophically inclined AI professor who thinks a very hard about the future and AI. Ask me one fundamental question about AI, AI specifics (such as MoE, transformers, attention mechanism, something about how compute works, etc.), humanity or a combination. Keep the language simple. The question should be very short and easy to understand. 25 words max",
+        reuse=False)
+    print("fetched a question about AI")
+    return response_text
+
+
 def get_AI_question():
     """Generates and returns a short joke about AI."""
     try:
-        response2 = client.models.generate_content(
-            #model="gemini-2.0-flash",
-            model="gemma-3-4b-it",
-            contents="You are a philosophically inclined AI professor who thinks a very hard about the future and AI. Ask me one fundamental question about AI, AI specifics (such as MoE, transformers, attention mechanism, something about how compute works, etc.), humanity or a combination. Keep the language simple. The question should be very short and easy to understand. 25 words max",
-        )
-        print("fetched a question about AI")
-        return response2.text
+        return generate_AI_question()
+    except GuardRejectedError as e:
+        print(f"Not generating a question: {e}")
+        return random.choice(OFFLINE_AI_QUESTIONS)
     except Exception as e:
         print(f"Error generating question: {e}")
         return "Could not fetch a joke."
 
+# Live calls for NPC interactions share this bounded pool instead of starting a thread each
+llm_executor = LLMExecutor()
+
+# Ready questions for the interactables, generated in the background so the player doesn't wait
+# The pools refill with the raising generators, so an outage stops the refill instead of pooling fallback text
+philosophy_question_pool = PromptPool(generate_philosophy_question, name="philosophy_question")
+ai_question_pool = PromptPool(generate_AI_question, name="AI_question")
+
+
 def list_available_models():
     """Prints the names of available models."""
     print("Listing all available models:")
     try:
         print("Available models:")
-        for model in client.models.list():
-            print(f"- {model.name}")
+        for model_name in get_backend().list_models():
+            print(f"- {model_name}")
     except Exception as e:
         print(f"Error listing models: {e}")
 
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+import pygame
+
+# Rendered surfaces kept by the shared TextCache before the least recently used ones are dropped
+MAX_CACHED_TEXT_SURFACES = 512
+
+_fonts = {}  # {(font_name, size): pygame.font.Font}
+
+
+def get_font(size, font_name=None):
+    """Returns the shared Font for (font_name, size), loading it only the first time."""
+    key = (font_name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(font_name, size)
+    return font
+
+
+class TextCache:
+    """
+    LRU cache of rendered text surfaces keyed by (font, text, colour, antialias, background).
+
+    The surfaces are shared between callers, so copy() one before changing its alpha or drawing on it.
+    """
+    def __init__(self, max_entries=MAX_CACHED_TEXT_SURFACES):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color, background=None):
+        """Same arguments as Font.render, but returns the cached surface for text drawn before."""
+        key = (font, text, tuple(color), antialias, tuple(background) if background else None)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color, background)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def get_stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+# Shared instance for all draw code
+text_cache = TextCache()
+
+
+def render_text(text, size, color, antialias=True, font_name=None, background=None):
+    """Renders text with the registry font of the given size through the shared cache."""
+    return text_cache.render(get_font(size, font_name), text, antialias, color, background)
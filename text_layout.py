@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from functools import lru_cache
+import textwrap
+
+# Wrapped paragraphs kept by the shared TextLayout before the least recently used ones are dropped
+MAX_CACHED_LAYOUTS = 256
+
+
+class TextLayout:
+    """
+    Greedy word wrapping by pixel width, memoized by (text, font, max_width).
+
+    Text that only grows (typewriter output, an answer being typed) is not re-wrapped from the
+    start: the layout resumes from the last word of the previous call for the same font and width.
+    Returned line lists are shared tuples.
+    """
+    def __init__(self, max_entries=MAX_CACHED_LAYOUTS):
+        self.max_entries = max_entries
+        self.layouts = OrderedDict()  # {(text, font, max_width): (line, ...)}
+        # {(font, max_width): (text, finished_lines, checkpoint)} for the most recent text of each font/width
+        self._growing = {}
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+
+    def wrap(self, text, font, max_width):
+        """Splits text on spaces into lines no wider than max_width (a single longer word gets its own line)."""
+        key = (text, font, max_width)
+        lines = self.layouts.get(key)
+        if lines is not None:
+            self.hits += 1
+            self.layouts.move_to_end(key)
+            return lines
+
+        self.misses += 1
+        words = text.split(' ')
+        previous = self._growing.get((font, max_width))
+        if previous and text.startswith(previous[0]):
+            # Only the previous last word can have changed, so resume from the state just before it
+            self.extensions += 1
+            previous_lines, (word_index, line_count, current_line) = previous[1], previous[2]
+            result = self._wrap_words(words, font, max_width, word_index, previous_lines[:line_count], current_line)
+        else:
+            result = self._wrap_words(words, font, max_width)
+
+        lines, finished_lines, checkpoint = result
+        self._growing[(font, max_width)] = (text, finished_lines, checkpoint)
+        self.layouts[key] = lines
+        if len(self.layouts) > self.max_entries:
+            self.layouts.popitem(last=False)
+        return lines
+
+    @staticmethod
+    def _wrap_words(words, font, max_width, start_index=0, finished_lines=None, current_line=""):
+        lines = list(finished_lines) if finished_lines else []
+        checkpoint = (start_index, len(lines), current_line)
+        for word_index in range(start_index, len(words)):
+            word = words[word_index]
+            checkpoint = (word_index, len(lines), current_line)
+            test_line = current_line + (" " if current_line else "") + word
+            if font.size(test_line)[0] <= max_width:
+                current_line = test_line
+            else:
+                if current_line:
+                    lines.append(current_line)
+                    current_line = word
+                else:
+                    lines.append(word)  # Word too long, add anyway
+
+        wrapped_lines = tuple(lines + [current_line]) if current_line else tuple(lines)
+        return wrapped_lines, lines, checkpoint
+
+    def wrap_paragraphs(self, text, font, max_width):
+        """Wraps each newline-separated paragraph, keeping blank paragraphs as empty lines."""
+        lines = []
+        for paragraph in text.split('\n'):
+            if not paragraph.strip():
+                lines.append("")
+            else:
+                lines.extend(self.wrap(paragraph, font, max_width))
+        return lines
+
+
+@lru_cache(maxsize=MAX_CACHED_LAYOUTS)
+def wrap_chars(text, width):
+    """Memoized textwrap.fill(text, width) split into lines, for per-frame draw code. Returns a tuple."""
+    return tuple(textwrap.wrap(text, width=width)) or ("",)
+
+
+# Shared instance for all draw code
+text_layout = TextLayout()
+
+
+def wrap_text(text, font, max_width):
+    return text_layout.wrap(text, font, max_width)
+
+
+def wrap_paragraphs(text, font, max_width):
+    return text_layout.wrap_paragraphs(text, font, max_width)
@@ -0,0 +1,105 @@
+from array import array
+
+EMPTY_TILE_ID = -1
+
+
+class TileLayer:
+    """
+    A fixed width x height grid of tile IDs stored row-major in one contiguous array('h') buffer.
+
+    layer[row][col] keeps working like the old lists of lists (rows are writable memoryview slices
+    of the buffer), but hot code should prefer get()/set(), which skip the row view entirely.
+    """
+    def __init__(self, width, height, fill_value=EMPTY_TILE_ID):
+        self.width = width
+        self.height = height
+        self.fill_value = fill_value
+        self.data = array('h', [fill_value]) * (width * height)
+        self._view = memoryview(self.data)
+
+    @classmethod
+    def from_rows(cls, rows, fill_value=EMPTY_TILE_ID, width=None, height=None):
+        """Builds a layer from a list of lists, padding ragged or missing rows with fill_value."""
+        if width is None:
+            width = max((len(row) for row in rows), default=0)
+        if height is None:
+            height = len(rows)
+
+        layer = cls(width, height, fill_value)
+        for row_idx, row in enumerate(rows[:height]):
+            row = row[:width]
+            start = row_idx * width
+            layer.data[start:start + len(row)] = array('h', row)
+        return layer
+
+    @classmethod
+    def ensure(cls, layer_data, fill_value=EMPTY_TILE_ID):
+        """Returns layer_data as a TileLayer, converting plain lists of lists. None stays None."""
+        if layer_data is None or isinstance(layer_data, cls):
+            return layer_data
+        return cls.from_rows(layer_data, fill_value)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def get(self, x, y):
+        """Returns the tile ID at column x, row y (no bounds check beyond the buffer's own)."""
+        return self.data[y * self.width + x]
+
+    def get_or_default(self, x, y, default):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.data[y * self.width + x]
+        return default
+
+    def set(self, x, y, tile_id):
+        self.data[y * self.width + x] = tile_id
+
+    def row(self, y):
+        """Returns a writable view of row y."""
+        start = y * self.width
+        return self._view[start:start + self.width]
+
+    def fill(self, tile_id, x=0, y=0, width=None, height=None):
+        """Bulk-fills a rectangle of tiles (the whole layer by default)."""
+        x_end = self.width if width is None else min(self.width, x + width)
+        y_end = self.height if height is None else min(self.height, y + height)
+        x = max(0, x)
+        if x_end <= x:
+            return
+        fill_row = array('h', [tile_id]) * (x_end - x)
+        for row_idx in range(max(0, y), y_end):
+            start = row_idx * self.width + x
+            self.data[start:start + len(fill_row)] = fill_row
+
+    def count(self, tile_id):
+        return self.data.count(tile_id)
+
+    def positions_of(self, tile_id):
+        """Returns [(row, col), ...] for every tile equal to tile_id, scanning the flat buffer once."""
+        width = self.width
+        return [divmod(index, width) for index, value in enumerate(self.data) if value == tile_id]
+
+    def to_rows(self):
+        return [self.row(row_idx).tolist() for row_idx in range(self.height)]
+
+    def copy(self):
+        layer = TileLayer(self.width, self.height, self.fill_value)
+        layer.data[:] = self.data
+        return layer
+
+    def __getitem__(self, y):
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError("TileLayer row index out of range")
+        return self.row(y)
+
+    def __len__(self):
+        return self.height
+
+    def __iter__(self):
+        for row_idx in range(self.height):
+            yield self.row(row_idx)
+
+    def __repr__(self):
+        return f"TileLayer({self.width}x{self.height})"
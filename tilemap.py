@@ -1,4 +1,7 @@
 import pygame # Ensure pygame is imported
+import threading
+from asset_manager import assets
+from tile_layer import TileLayer
 
 # Constants
 TILE_ORIG_SIZE = 16
@@ -53,19 +56,9 @@ _new_map_width_tiles = 35
 _new_map_height_tiles = 30
 _fill_tile_id = 41 # Tile ID to use for new areas
 
-MAP = []
-for r_idx in range(_new_map_height_tiles):
-    new_row = []
-    if r_idx < len(_original_map_rows): # If it's an existing row index
-        original_row = _original_map_rows[r_idx]
-        new_row.extend(original_row)
-        # Extend the row if it's shorter than the new width
-        if len(original_row) < _new_map_width_tiles:
-            new_row.extend([_fill_tile_id] * (_new_map_width_tiles - len(original_row)))
-    else: # It's a completely new row
-        new_row.extend([_fill_tile_id] * _new_map_width_tiles)
-    MAP.append(new_row)
-
+# Rows shorter than the map width, and rows past the original data, are filled with _fill_tile_id
+MAP = TileLayer.from_rows(_original_map_rows, fill_value=_fill_tile_id,
+                          width=_new_map_width_tiles, height=_new_map_height_tiles)
 
 # Define the building layer data
 _original_building_rows = [
@@ -93,22 +86,8 @@ _original_building_rows = [
 
 
 # Building Map Layer (same dimensions as MAP, initialized with EMPTY_TILE_ID)
-BUILDING_MAP = []
-for r_idx in range(_new_map_height_tiles):
-    new_row = []
-    if r_idx < len(_original_building_rows):
-        original_row = _original_building_rows[r_idx]
-        # Iterate up to _new_map_width_tiles
-        for c_idx in range(_new_map_width_tiles):
-            if c_idx < len(original_row):
-                new_row.append(original_row[c_idx])
-            else:
-                new_row.append(EMPTY_TILE_ID) # Fill short rows with empty
-    else:
-        # Fill new rows (if _original_building_rows is shorter than _new_map_height_tiles) with empty
-        new_row.extend([EMPTY_TILE_ID] * _new_map_width_tiles)
-    BUILDING_MAP.append(new_row)
-
+BUILDING_MAP = TileLayer.from_rows(_original_building_rows, fill_value=EMPTY_TILE_ID,
+                                   width=_new_map_width_tiles, height=_new_map_height_tiles)
 
 # Collectibles system - track collectible positions and respawn timers
 collectibles = {}  # {(row, col): {"timer": 0, "collected": False, "original_tile": 933}}
@@ -124,15 +103,13 @@ def init_collectibles():
     
     # Find all walkable positions (COLLISION_MAP = 0)
     walkable_positions = []
-    for row_idx in range(len(COLLISION_MAP)):
-        for col_idx in range(len(COLLISION_MAP[row_idx])):
-            if COLLISION_MAP[row_idx][col_idx] == 0:  # Walkable tile
-                # Calculate distance from player spawn point
-                distance = ((row_idx - start_y_tile) ** 2 + (col_idx - start_x_tile) ** 2) ** 0.5
-                
-                # Only add if outside exclusion radius
-                if distance > exclusion_radius:
-                    walkable_positions.append((row_idx, col_idx))
+    for row_idx, col_idx in COLLISION_MAP.positions_of(0):
+        # Calculate distance from player spawn point
+        distance = ((row_idx - start_y_tile) ** 2 + (col_idx - start_x_tile) ** 2) ** 0.5
+        
+        # Only add if outside exclusion radius
+        if distance > exclusion_radius:
+            walkable_positions.append((row_idx, col_idx))
 
     # Randomly select 5 positions for coins
     import random
@@ -141,7 +118,8 @@ def init_collectibles():
         
         # Place coins at selected positions
         for row_idx, col_idx in selected_positions:
-            BUILDING_MAP[row_idx][col_idx] = 933  # Place collectible tile
+            BUILDING_MAP.set(col_idx, row_idx, 933)  # Place collectible tile
+            mark_tile_dirty(BUILDING_MAP, row_idx, col_idx)
             collectibles[(row_idx, col_idx)] = {
                 "timer": 0, 
                 "collected": False, 
@@ -154,7 +132,6 @@ def init_collectibles():
 
 def update_collectibles():
     """Update collectible timers and respawn items"""
-    global BUILDING_MAP
     import random
 
     for (row, col), data in list(collectibles.items()):  # Use list() to avoid modification during iteration
@@ -168,16 +145,15 @@ def update_collectibles():
                 walkable_positions = []
                 occupied_positions = set(collectibles.keys())  # Positions with active collectibles
                 
-                for row_idx in range(len(COLLISION_MAP)):
-                    for col_idx in range(len(COLLISION_MAP[row_idx])):
-                        if (COLLISION_MAP[row_idx][col_idx] == 0 and  # Walkable tile
-                            (row_idx, col_idx) not in occupied_positions and  # Not occupied by collectible
-                            BUILDING_MAP[row_idx][col_idx] == EMPTY_TILE_ID):  # Not occupied by building
-                            walkable_positions.append((row_idx, col_idx))
+                for row_idx, col_idx in COLLISION_MAP.positions_of(0):  # Walkable tiles
+                    if ((row_idx, col_idx) not in occupied_positions and  # Not occupied by collectible
+                        BUILDING_MAP.get(col_idx, row_idx) == EMPTY_TILE_ID):  # Not occupied by building
+                        walkable_positions.append((row_idx, col_idx))
                 # Spawn at new random location if available
                 if walkable_positions:
                     new_row, new_col = random.choice(walkable_positions)
-                    BUILDING_MAP[new_row][new_col] = 933  # Place collectible tile
+                    BUILDING_MAP.set(new_col, new_row, 933)  # Place collectible tile
+                    mark_tile_dirty(BUILDING_MAP, new_row, new_col)
                     collectibles[(new_row, new_col)] = {
                         "timer": 0, 
                         "collected": False, 
@@ -195,23 +171,32 @@ def collect_item(world_x, world_y, tile_size):
     # Check for collectibles (coins)
     if (tile_y, tile_x) in collectibles and not collectibles[(tile_y, tile_x)]["collected"]:
         collectibles[(tile_y, tile_x)]["collected"] = True
-        if tile_y < len(BUILDING_MAP) and tile_x < len(BUILDING_MAP[tile_y]):
-            BUILDING_MAP[tile_y][tile_x] = EMPTY_TILE_ID  # Remove from map
+        if BUILDING_MAP.in_bounds(tile_x, tile_y):
+            BUILDING_MAP.set(tile_x, tile_y, EMPTY_TILE_ID)  # Remove from map
+            mark_tile_dirty(BUILDING_MAP, tile_y, tile_x)
         print(f"Item collected at tile ({tile_y}, {tile_x})")
         return "collectible"  # Return type instead of True
     
     # Check for quote tracker tiles (961, 962)
-    if (tile_y < len(BUILDING_MAP) and tile_x < len(BUILDING_MAP[tile_y]) and 
-        BUILDING_MAP[tile_y][tile_x] in [961, 962]):
+    if BUILDING_MAP.get_or_default(tile_x, tile_y, EMPTY_TILE_ID) in (961, 962):
         return "quote_tracker"  # Return quote tracker type
     
     return None  # No interaction
 
+def is_near_collectible(world_x, world_y, tile_size, radius_tiles=3):
+    """Returns True if an uncollected coin is within radius_tiles of the world position."""
+    tile_x = world_x // tile_size
+    tile_y = world_y // tile_size
+    for (row, col), data in collectibles.items():
+        if not data["collected"] and abs(row - tile_y) <= radius_tiles and abs(col - tile_x) <= radius_tiles:
+            return True
+    return False
+
 
 # Collision map (0 = walkable, 1 = wall)
 # Manually define COLLISION_MAP similar to wizardHouse.py
-# Dimensions should be _new_map_height_tiles (30) x _new_map_width_tiles (30)
-COLLISION_MAP = [
+# Dimensions should be _new_map_height_tiles (30) x _new_map_width_tiles (35)
+COLLISION_MAP = TileLayer.from_rows([
     [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1], # 35 elements
     [1, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1],
     [1, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1, 1],
@@ -242,7 +227,7 @@ COLLISION_MAP = [
     [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
     [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
     [1] 
-]
+], fill_value=1, width=_new_map_width_tiles, height=_new_map_height_tiles) # Missing tiles are walls
 
 
 
@@ -250,26 +235,83 @@ COLLISION_MAP = [
 # Function to get tile rectangle from tileset
 tile_rects = {}
 
-def init_tilemap(tileset_path_from_main, tileset_actual_width_tiles, tileset_tile_original_size): # MODIFIED: Added tileset_tile_original_size
-    global tileset_img, tile_rects
-    tile_rects = {} 
+# Scaled tile surfaces for the active tileset, keyed by (tile_id, target_size)
+scaled_tiles = {}
+
+# The cache entry of the tileset currently used for drawing
+active_tileset = None
+
+# Per-tileset cache so switching maps doesn't reload the PNG or rescale tiles again.
+# {(tileset_path, width_tiles, orig_size): {"key": ..., "image": Surface, "rects": {...}, "scaled_tiles": {...}}}
+_tileset_cache = {}
+
+# Guards _tileset_cache and _chunk_renderers, MapManager fills them from a preload thread too.
+# get_scaled_tile stays lock-free, the worst a race there can do is scale the same tile twice.
+_cache_lock = threading.RLock()
+
+def load_tileset(tileset_path, tileset_width_tiles, tileset_tile_original_size):
+    """Loads a tileset into the cache (or returns the cached entry) without making it the active one."""
+    cache_key = (tileset_path, tileset_width_tiles, tileset_tile_original_size)
+    with _cache_lock:
+        cached_tileset = _tileset_cache.get(cache_key)
+        if cached_tileset:
+            return cached_tileset
+        return _load_tileset_locked(cache_key)
+
+def _load_tileset_locked(cache_key):
+    tileset_path, tileset_width_tiles, tileset_tile_original_size = cache_key
+
+    print(f"Attempting to load tileset: {tileset_path} (orig tile size: {tileset_tile_original_size})")
+    loaded_img = assets.get_image(tileset_path)
+    print(f"Tileset '{tileset_path}' loaded successfully. Size: {loaded_img.get_size()}")
+
+    # Use the passed tileset_tile_original_size for row calculation
+    num_tile_rows_in_tileset = loaded_img.get_height() // tileset_tile_original_size
+    total_tiles_in_tileset = tileset_width_tiles * num_tile_rows_in_tileset 
+
+    rects = {}
+    for i in range(total_tiles_in_tileset):
+        row, col = divmod(i, tileset_width_tiles) 
+        rects[i] = pygame.Rect(col * tileset_tile_original_size, row * tileset_tile_original_size, tileset_tile_original_size, tileset_tile_original_size)
+    print(f"Initialized {len(rects)} tile rects using tileset width {tileset_width_tiles} and orig tile size {tileset_tile_original_size}.")
+
+    tileset = {
+        "key": cache_key,
+        "image": loaded_img,
+        "rects": rects,
+        "scaled_tiles": {}
+    }
+    _tileset_cache[cache_key] = tileset
+    return tileset
+
+def activate_tileset(tileset):
+    """Makes a loaded tileset the one used for drawing."""
+    global tileset_img, tile_rects, scaled_tiles, active_tileset
+    active_tileset = tileset
+    tileset_img = tileset["image"]
+    tile_rects = tileset["rects"]
+    scaled_tiles = tileset["scaled_tiles"]
+
+def release_tileset(tileset):
+    """Drops a tileset and its scaled tiles from the cache (the active tileset is kept)."""
+    if tileset is not active_tileset:
+        with _cache_lock:
+            _tileset_cache.pop(tileset["key"], None)
+            if not any(other["image"] is tileset["image"] for other in _tileset_cache.values()):
+                assets.evict(tileset["key"][0])
+
+def init_tilemap(tileset_path_from_main, tileset_actual_width_tiles, tileset_tile_original_size, layers=None, tile_game_size=TILE_GAME_SIZE): # MODIFIED: Added tileset_tile_original_size
+    global tileset_img
+    cache_key = (tileset_path_from_main, tileset_actual_width_tiles, tileset_tile_original_size)
+    was_cached = cache_key in _tileset_cache
     try:
-        print(f"Attempting to load tileset: {tileset_path_from_main} (orig tile size: {tileset_tile_original_size})")
-        loaded_img = pygame.image.load(tileset_path_from_main)
-        tileset_img = loaded_img.convert_alpha()
-        print(f"Tileset '{tileset_path_from_main}' loaded successfully. Size: {tileset_img.get_size()}")
-
-        tileset_actual_height_pixels = tileset_img.get_height()
-        # Use the passed tileset_tile_original_size for row calculation
-        num_tile_rows_in_tileset = tileset_actual_height_pixels // tileset_tile_original_size
-        total_tiles_in_tileset = tileset_actual_width_tiles * num_tile_rows_in_tileset 
-
-        for i in range(total_tiles_in_tileset):
-            row, col = divmod(i, tileset_actual_width_tiles) 
-            # Use the passed tileset_tile_original_size for Rect creation
-            rect = pygame.Rect(col * tileset_tile_original_size, row * tileset_tile_original_size, tileset_tile_original_size, tileset_tile_original_size)
-            tile_rects[i] = rect
-        print(f"Initialized {len(tile_rects)} tile rects using tileset width {tileset_actual_width_tiles} and orig tile size {tileset_tile_original_size}.")
+        activate_tileset(load_tileset(tileset_path_from_main, tileset_actual_width_tiles, tileset_tile_original_size))
+        warm_tile_cache(layers, tile_game_size)
+        if was_cached:
+            # Tileset was loaded before (e.g. returning to a map), its image and scaled tiles are reused
+            print(f"Tileset '{tileset_path_from_main}' reused from cache ({len(scaled_tiles)} scaled tiles).")
+        else:
+            print(f"Pre-scaled {len(scaled_tiles)} tiles to {tile_game_size}px.")
 
     except pygame.error as e:
         print(f"CRITICAL PYGAME ERROR loading tileset '{tileset_path_from_main}': {e}")
@@ -282,6 +324,56 @@ def init_tilemap(tileset_path_from_main, tileset_actual_width_tiles, tileset_til
 def get_tile_rect(tile_id):
     return tile_rects.get(tile_id)
 
+def get_scaled_tile(tile_id, tile_size, tileset=None):
+    """
+    Returns the display-format tile surface scaled to tile_size, scaling it only on first use.
+    Uses the active tileset unless a loaded tileset entry is passed.
+    """
+    if tileset is None:
+        tileset = active_tileset
+        if tileset is None:
+            return None
+
+    tileset_scaled_tiles = tileset["scaled_tiles"]
+    cache_key = (tile_id, tile_size)
+    if cache_key in tileset_scaled_tiles:
+        return tileset_scaled_tiles[cache_key]
+
+    scaled_tile = None
+    tile_img_rect = tileset["rects"].get(tile_id)
+    if tile_img_rect:
+        scaled_tile = pygame.transform.scale(
+            tileset["image"].subsurface(tile_img_rect),
+            (tile_size, tile_size)
+        ).convert_alpha()
+    tileset_scaled_tiles[cache_key] = scaled_tile # Unknown tile IDs are cached as None too
+    return scaled_tile
+
+def warm_tile_cache(layers, tile_size, tileset=None):
+    """Pre-scales every tile ID used by the given layers so drawing only has to blit."""
+    if not layers:
+        return
+    for layer_data in layers:
+        if not layer_data:
+            continue
+        for tile_id in set(TileLayer.ensure(layer_data).data):
+            if tile_id != EMPTY_TILE_ID:
+                get_scaled_tile(tile_id, tile_size, tileset)
+
+def get_visible_tile_range(surface, camera, cell_size, num_rows, num_cols, padding=1):
+    """
+    Works out which rows/columns of a grid of cell_size cells are on screen for the current camera.
+    Returns (row_start, row_end, col_start, col_end) with exclusive ends, clamped to the grid and
+    widened by `padding` cells on each side.
+    """
+    view_left = -camera.camera.x
+    view_top = -camera.camera.y
+    col_start = max(0, view_left // cell_size - padding)
+    row_start = max(0, view_top // cell_size - padding)
+    col_end = min(num_cols, (view_left + surface.get_width() - 1) // cell_size + 1 + padding)
+    row_end = min(num_rows, (view_top + surface.get_height() - 1) // cell_size + 1 + padding)
+    return row_start, row_end, col_start, col_end
+
 # Renamed and modified to accept tile_size and ensure tileset_img is loaded
 def _draw_layer_internal(surface, layer_data, camera, current_tile_size):
     global tileset_img # Ensure access to the loaded tileset
@@ -289,30 +381,158 @@ def _draw_layer_internal(surface, layer_data, camera, current_tile_size):
         # Error message will be printed by init_tilemap if loading failed
         return
 
-    for row_idx, row in enumerate(layer_data):
-        for col_idx, tile_id in enumerate(row):
+    layer_data = TileLayer.ensure(layer_data)
+
+    # Only walk the tiles inside the camera view (plus one tile of padding), so the cost
+    # depends on the window size rather than on the size of the map
+    row_start, row_end, col_start, col_end = get_visible_tile_range(
+        surface, camera, current_tile_size, layer_data.height, layer_data.width
+    )
+
+    tile_data = layer_data.data
+    for row_idx in range(row_start, row_end):
+        screen_y = row_idx * current_tile_size + camera.camera.y
+        row_offset = row_idx * layer_data.width
+        for col_idx in range(col_start, col_end):
+            tile_id = tile_data[row_offset + col_idx]
             if tile_id != EMPTY_TILE_ID: 
-                tile_img_rect = get_tile_rect(tile_id)
-                if tile_img_rect:
+                scaled_tile = get_scaled_tile(tile_id, current_tile_size)
+                if scaled_tile:
                     screen_x = col_idx * current_tile_size + camera.camera.x
-                    screen_y = row_idx * current_tile_size + camera.camera.y
-                    
-                    if screen_x + current_tile_size > 0 and screen_x < surface.get_width() and \
-                       screen_y + current_tile_size > 0 and screen_y < surface.get_height():
-                        scaled_tile = pygame.transform.scale(
-                            tileset_img.subsurface(tile_img_rect), 
-                            (current_tile_size, current_tile_size)
-                        )
-                        surface.blit(scaled_tile, (screen_x, screen_y))
+                    surface.blit(scaled_tile, (screen_x, screen_y))
+
+# Number of tiles along each side of a baked chunk
+CHUNK_SIZE_TILES = 8
+
+class ChunkedMapRenderer:
+    """Pre-composites a map's static layers into cached chunk surfaces, re-baking only dirty chunks."""
+    def __init__(self, layers, tile_size, chunk_size_tiles=CHUNK_SIZE_TILES, tileset=None):
+        self.tileset = tileset # None means "whatever tileset is active when drawing"
+        self.layers = [TileLayer.ensure(layer_data) for layer_data in layers if layer_data] # Bottom to top draw order
+        self.tile_size = tile_size
+        self.chunk_size_tiles = chunk_size_tiles
+        self.rows = max((layer_data.height for layer_data in self.layers), default=0)
+        self.cols = max((layer_data.width for layer_data in self.layers), default=0)
+        self.chunk_rows = -(-self.rows // chunk_size_tiles) # Ceiling division
+        self.chunk_cols = -(-self.cols // chunk_size_tiles)
+        self.chunks = {} # {(chunk_row, chunk_col): Surface}
+        self.dirty_chunks = set()
+        self.baked_with_tileset = None # Chunks are only valid for the tileset they were baked with
+
+    def uses_layer(self, layer_data):
+        return any(layer_data is own_layer for own_layer in self.layers)
+
+    def mark_tile_dirty(self, row_idx, col_idx):
+        """Flags the chunk containing the given tile for re-baking on the next draw."""
+        chunk_key = (row_idx // self.chunk_size_tiles, col_idx // self.chunk_size_tiles)
+        if chunk_key in self.chunks:
+            self.dirty_chunks.add(chunk_key)
+
+    def invalidate(self):
+        """Drops every baked chunk, e.g. after the tileset changed."""
+        self.chunks.clear()
+        self.dirty_chunks.clear()
+
+    def _bake_chunk(self, chunk_row, chunk_col):
+        """Composites all layers of one chunk into a single surface."""
+        row_start = chunk_row * self.chunk_size_tiles
+        col_start = chunk_col * self.chunk_size_tiles
+        row_end = min(row_start + self.chunk_size_tiles, self.rows)
+        col_end = min(col_start + self.chunk_size_tiles, self.cols)
+
+        chunk_surface = pygame.Surface(
+            ((col_end - col_start) * self.tile_size, (row_end - row_start) * self.tile_size),
+            pygame.SRCALPHA
+        ).convert_alpha()
+
+        for layer_data in self.layers:
+            tile_data = layer_data.data
+            for row_idx in range(row_start, min(row_end, layer_data.height)):
+                row_offset = row_idx * layer_data.width
+                for col_idx in range(col_start, min(col_end, layer_data.width)):
+                    tile_id = tile_data[row_offset + col_idx]
+                    if tile_id != EMPTY_TILE_ID:
+                        scaled_tile = get_scaled_tile(tile_id, self.tile_size, self.baked_with_tileset)
+                        if scaled_tile:
+                            chunk_surface.blit(scaled_tile, ((col_idx - col_start) * self.tile_size,
+                                                             (row_idx - row_start) * self.tile_size))
+
+        self.chunks[(chunk_row, chunk_col)] = chunk_surface
+        self.dirty_chunks.discard((chunk_row, chunk_col))
+        return chunk_surface
+
+    def _check_tileset(self):
+        tileset = self.tileset or active_tileset
+        if self.baked_with_tileset is not tileset:
+            self.invalidate()
+            self.baked_with_tileset = tileset
+        return tileset is not None
+
+    def bake_all(self):
+        """Bakes every chunk up front (used when preparing a map before it is shown)."""
+        if not self._check_tileset():
+            return
+        for chunk_row in range(self.chunk_rows):
+            for chunk_col in range(self.chunk_cols):
+                if (chunk_row, chunk_col) not in self.chunks or (chunk_row, chunk_col) in self.dirty_chunks:
+                    self._bake_chunk(chunk_row, chunk_col)
+
+    def draw(self, surface, camera):
+        if not self._check_tileset():
+            return
+
+        chunk_pixel_size = self.chunk_size_tiles * self.tile_size
+        row_start, row_end, col_start, col_end = get_visible_tile_range(
+            surface, camera, chunk_pixel_size, self.chunk_rows, self.chunk_cols, padding=0
+        )
+
+        for chunk_row in range(row_start, row_end):
+            screen_y = chunk_row * chunk_pixel_size + camera.camera.y
+            for chunk_col in range(col_start, col_end):
+                chunk_key = (chunk_row, chunk_col)
+                chunk_surface = self.chunks.get(chunk_key)
+                if chunk_surface is None or chunk_key in self.dirty_chunks:
+                    chunk_surface = self._bake_chunk(chunk_row, chunk_col)
+                surface.blit(chunk_surface, (chunk_col * chunk_pixel_size + camera.camera.x, screen_y))
+
+
+# Chunk renderers, keyed by (id(map_layout), tile_size). Each renderer keeps its layers alive,
+# so the id can't be reused by another list while the entry exists.
+_chunk_renderers = {}
+
+def get_chunk_renderer(map_layout, building_layout, decoration_layout, tile_size, tileset=None):
+    """Returns the chunk renderer for this set of layers, creating it on first use."""
+    renderer_key = (id(map_layout), tile_size)
+    renderer = _chunk_renderers.get(renderer_key)
+    if renderer is None:
+        with _cache_lock:
+            renderer = _chunk_renderers.get(renderer_key)
+            if renderer is None:
+                renderer = ChunkedMapRenderer([map_layout, building_layout, decoration_layout], tile_size, tileset=tileset)
+                _chunk_renderers[renderer_key] = renderer
+    if tileset is not None:
+        renderer.tileset = tileset
+    return renderer
+
+def release_chunk_renderer(map_layout, tile_size):
+    """Drops the baked chunks of a map, e.g. when it is evicted from MapManager's scene cache."""
+    with _cache_lock:
+        _chunk_renderers.pop((id(map_layout), tile_size), None)
+
+def mark_tile_dirty(layer_data, row_idx, col_idx):
+    """Call after writing a tile into a layer so chunks containing it get re-baked."""
+    with _cache_lock:
+        renderers = list(_chunk_renderers.values())  # The preload thread may add renderers meanwhile
+    for renderer in renderers:
+        if renderer.uses_layer(layer_data):
+            renderer.mark_tile_dirty(row_idx, col_idx)
 
 # Modified to accept map layouts and tile_size as parameters
 def draw_map(surface, camera, map_layout, building_layout, decoration_layout, tile_size):
+    if tileset_img is None:
+        return
     if map_layout:
-        _draw_layer_internal(surface, map_layout, camera, tile_size)
-    if building_layout: # Check if building_layout exists
-        _draw_layer_internal(surface, building_layout, camera, tile_size)
-    if decoration_layout: # ADDED: Draw decoration layer
-        _draw_layer_internal(surface, decoration_layout, camera, tile_size)
+        get_chunk_renderer(map_layout, building_layout, decoration_layout, tile_size).draw(surface, camera)
 
 
 def can_move(world_x, world_y):
@@ -0,0 +1,82 @@
+import os
+import random
+import time
+
+# Run without opening a real window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import tilemap
+from camera import Camera
+from tile_layer import TileLayer
+
+SCREEN_WIDTH = 1700
+SCREEN_HEIGHT = 900
+SYNTHETIC_MAP_SIZE = 500 # 500x500 tiles
+FRAMES = 60
+
+
+def _draw_layer_full_scan(surface, layer_data, camera, current_tile_size):
+    """The previous renderer: visits every tile of a list-of-lists layer and bounds-tests it against the screen."""
+    for row_idx, row in enumerate(layer_data):
+        for col_idx, tile_id in enumerate(row):
+            if tile_id != tilemap.EMPTY_TILE_ID:
+                scaled_tile = tilemap.get_scaled_tile(tile_id, current_tile_size)
+                if scaled_tile:
+                    screen_x = col_idx * current_tile_size + camera.camera.x
+                    screen_y = row_idx * current_tile_size + camera.camera.y
+
+                    if screen_x + current_tile_size > 0 and screen_x < surface.get_width() and \
+                       screen_y + current_tile_size > 0 and screen_y < surface.get_height():
+                        surface.blit(scaled_tile, (screen_x, screen_y))
+
+
+def build_synthetic_map(size, seed=0):
+    """Builds a size x size ground layer using tiles that exist in the main tileset."""
+    rng = random.Random(seed)
+    tile_ids = [11, 41, 47, 92, 137, 182]
+    return TileLayer.from_rows([[rng.choice(tile_ids) for _ in range(size)] for _ in range(size)])
+
+
+def time_draw(draw_func, screen, layer_data, camera, tile_size, frames=FRAMES):
+    """Returns the average milliseconds per frame while panning the camera across the map."""
+    map_pixels = len(layer_data) * tile_size
+    start = time.perf_counter()
+    for frame in range(frames):
+        offset = (frame * 97) % (map_pixels - SCREEN_WIDTH)
+        camera.camera.topleft = (-offset, -offset // 2)
+        draw_func(screen, layer_data, camera, tile_size)
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    tilemap.init_tilemap('cloud_tileset.png', tilemap.MAIN_MAP_TILESET_WIDTH, tilemap.TILE_ORIG_SIZE)
+
+    camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
+    tile_size = tilemap.TILE_GAME_SIZE
+
+    results = []
+    for map_name, layer_data in [("main MAP (35x30)", tilemap.MAP),
+                                 (f"synthetic ({SYNTHETIC_MAP_SIZE}x{SYNTHETIC_MAP_SIZE})", build_synthetic_map(SYNTHETIC_MAP_SIZE))]:
+        tilemap.warm_tile_cache([layer_data], tile_size)
+        full_scan_ms = time_draw(_draw_layer_full_scan, screen, layer_data.to_rows(), camera, tile_size,
+                                 frames=5 if len(layer_data) > 100 else FRAMES)
+        viewport_ms = time_draw(tilemap._draw_layer_internal, screen, layer_data, camera, tile_size)
+
+        renderer = tilemap.ChunkedMapRenderer([layer_data], tile_size)
+        chunked_ms = time_draw(lambda surface, _layer, cam, _size: renderer.draw(surface, cam),
+                               screen, layer_data, camera, tile_size)
+        results.append((map_name, full_scan_ms, viewport_ms, chunked_ms))
+
+    print()
+    print(f"{'map':<24}{'full scan':>12}{'viewport':>12}{'chunked':>12}   (ms/frame)")
+    for map_name, full_scan_ms, viewport_ms, chunked_ms in results:
+        print(f"{map_name:<24}{full_scan_ms:>12.2f}{viewport_ms:>12.2f}{chunked_ms:>12.2f}")
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
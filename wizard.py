@@ -1,21 +1,21 @@
 import pygame
 from entity import Entity
-from staticAPI import get_philosophy_question
-import threading 
-import textwrap 
+from asset_manager import get_image
+from text_layout import wrap_chars
+from staticAPI import get_philosophy_question, philosophy_question_pool, llm_executor
 
 
 
 class Wizard(Entity):
     def __init__(self, x, y, interaction_radius=30, interaction_offset_y=28):
+        # Scale the loaded image to player's dimensions (e.g., 128x128)
+        player_size = (84, 128) # Assuming player size is 128x128
         # Entity's __init__ loads the image and sets self.image and self.rect
-        super().__init__(x, y, "images/npcs/theWizard.png")
+        super().__init__(x, y, "images/npcs/theWizard.png", player_size)
         self.id = "wizard" # Unique ID for this interactable
 
-        # Scale the loaded image to player's dimensions (e.g., 128x128)
-        player_size = (84, 128) # Assuming player size is 128x128
-        self.image_right = pygame.transform.scale(self.image, player_size)
-        self.image_left = pygame.transform.flip(self.image_right, True, False) # Flip horizontally
+        self.image_right = self.image
+        self.image_left = get_image("images/npcs/theWizard.png", player_size, flip_x=True) # Flip horizontally
 
         self.facing_right = True # Initial facing direction
         self.image = self.image_right # Set current image to the scaled right-facing one
@@ -40,39 +40,54 @@ class Wizard(Entity):
         
         self.interaction_message = self.prompt_talk # Initial message
         self.is_fetching_joke = False
-        self.joke_fetch_thread = None
+        self.joke_request_id = None
+        self.request_generation = 0 # Bumped on reset so a late answer can't overwrite the prompt
         self.new_message_to_type = False # Flag for main loop to start typing
 
     def request_new_joke(self):
         if not self.is_fetching_joke:
+            joke = philosophy_question_pool.take()
+            if joke:
+                self._show_joke(joke)
+                self.new_message_to_type = True
+                return
+            # Nothing ready yet, ask the API now
             self.is_fetching_joke = True
             self.interaction_message = "Wizard is thinking..."
             self.new_message_to_type = True # Signal to type "thinking..."
-            self.joke_fetch_thread = threading.Thread(target=self._fetch_and_update_joke)
-            self.joke_fetch_thread.daemon = True # Allow main program to exit even if thread is running
-            self.joke_fetch_thread.start()
+            generation = self.request_generation
+            self.joke_request_id = llm_executor.submit(get_philosophy_question,
+                                                       lambda joke: self._on_joke_fetched(joke, generation))
 
-    def _fetch_and_update_joke(self):
-        # get_google_joke is an API call, so it's fine in a thread
-        joke = get_philosophy_question() 
+    def _on_joke_fetched(self, joke, generation):
+        # Called on an executor thread, joke is None if the call failed or timed out
+        if generation != self.request_generation:
+            return # The player walked away in the meantime
+        self.joke_request_id = None
+        self._show_joke(joke)
+        self.is_fetching_joke = False
+        self.new_message_to_type = True # Signal to type the joke/result
+
+    def _show_joke(self, joke):
         WRAP_WIDTH = 50 # Adjust this width as needed
 
         if joke is None or joke == "Could not fetch a joke.": # Check for None and the exact error string
             self.interaction_message = f"Wizard seems to have forgotten the joke. Please try again later."
         else:
             # Wrap the joke before adding it to the message
-            wrapped_joke = textwrap.fill(joke, width=WRAP_WIDTH)
+            wrapped_joke = '\n'.join(wrap_chars(joke, WRAP_WIDTH))
             # Ensure joke string is clean for display (e.g., escape newlines if necessary, though f-string handles it)
             self.interaction_message = f"Wizard says:\n\"{wrapped_joke}\""
-        self.is_fetching_joke = False
-        self.new_message_to_type = True # Signal to type the joke/result
 
     def reset_interaction_state(self):
         """Resets the wizard's message to the initial talk prompt."""
+        self.request_generation += 1
+        if self.joke_request_id is not None:
+            llm_executor.cancel(self.joke_request_id)
+            self.joke_request_id = None
         self.interaction_message = self.prompt_talk
         self.is_fetching_joke = False 
         self.new_message_to_type = False # Don't type the reset message, just set it
-        # If a thread is running, it will complete, but its result might be ignored or overwritten.
 
     def get_interaction_properties(self):
         """Returns a dictionary of properties needed for interaction management."""
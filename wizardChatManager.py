@@ -1,8 +1,15 @@
 import pygame
-import google.generativeai as genai
-import os
-import textwrap
-from dotenv import load_dotenv
+import queue
+import threading
+from text_cache import get_font, render_text
+from text_layout import wrap_chars
+from llm_cache import llm_cache, history_to_contents
+from llm_backend import get_backend
+from llm_guard import GuardRejectedError
+from chat_context import ChatContext
+
+WIZARD_MODEL_NAME = 'gemini-2.0-flash-lite'
+WIZARD_SYSTEM_INSTRUCTION = "You are a wise and ancient wizard with deep knowledge of magic, philosophy, and the mysteries of the universe. You are specifically interested in AI and the future. Keep your responses engaging and short. You are speaking to a visitor in your house who has come to seek wisdom and conversation. Keep your answers simple and easy to understand. Nothing vague or cliché!"
 
 class WizardChatManager:
     def __init__(self, screen_width, screen_height):
@@ -10,7 +17,18 @@ class WizardChatManager:
         self.screen_height = screen_height
         self.is_active = False
         self.chat_session = None
+        # What the model sees of the conversation: a rolling summary plus the latest turns within a token budget
+        self.chat_context = ChatContext()
         self.conversation_history = []
+        # Pre-rendered chat log, one entry per wrapped line: a list of (surface, x) pieces, or None for a blank line.
+        # Only grows when a message is added, so drawing and scrolling don't depend on the conversation length.
+        self.chat_lines = []
+        # Streaming replies: the worker thread puts (generation, kind, text) here and update() applies them
+        self.reply_queue = queue.Queue()
+        self.reply_generation = 0  # Bumped on cancel/new conversation so late chunks of an old reply are dropped
+        self.is_waiting_for_reply = False  # From sending until the reply is finished or cancelled
+        self.reply_worker = None
+        self._streaming_line_start = None  # Index in chat_lines where the reply being streamed starts
         self.current_input = ""
         self.input_active = False
         self.scroll_offset = 0
@@ -25,8 +43,8 @@ class WizardChatManager:
         
         # Font setup
         pygame.font.init()
-        self.font = pygame.font.Font(None, 36)
-        self.input_font = pygame.font.Font(None, 40)
+        self.font = get_font(36)
+        self.input_font = get_font(40)
         
         # Layout dimensions
         self.chat_width = screen_width - 100
@@ -35,6 +53,8 @@ class WizardChatManager:
         self.chat_y = 50
         self.input_height = 50
         self.input_y = self.chat_y + self.chat_height - self.input_height
+        self.line_height = self.font.get_height() + 2
+        self.visible_lines = (self.chat_height - self.input_height - 40) // self.line_height
         
         # Text wrapping width (in characters)
         self.wrap_width = 80
@@ -43,24 +63,9 @@ class WizardChatManager:
         self._init_api()
     
     def _init_api(self):
-        """Initialize the Google Generative AI API"""
+        """Start the wizard's chat session on the configured model backend"""
         try:
-            load_dotenv()
-            google_api_key = os.getenv("GOOGLE_API_KEY")
-            
-            if not google_api_key:
-                print("Error: GOOGLE_API_KEY not found in .env file")
-                return False
-            
-            genai.configure(api_key=google_api_key)
-            
-            model = genai.GenerativeModel(
-                #model_name='gemini-1.5-flash',
-                model_name='gemini-2.0-flash-lite',
-                system_instruction="You are a wise and ancient wizard with deep knowledge of magic, philosophy, and the mysteries of the universe. You are specifically interested in AI and the future. Keep your responses engaging and short. You are speaking to a visitor in your house who has come to seek wisdom and conversation. Keep your answers simple and easy to understand. Nothing vague or cliché!"
-            )
-            
-            self.chat_session = model.start_chat(history=[])
+            self.chat_session = get_backend().start_chat(WIZARD_MODEL_NAME, WIZARD_SYSTEM_INSTRUCTION)
             return True
             
         except Exception as e:
@@ -75,13 +80,17 @@ class WizardChatManager:
         
         self.is_active = True
         self.input_active = True
-        self.conversation_history = [
-            ("Wizard", "Greetings, friend! Welcome to my humble abode. What brings you here today?")
-        ]
+        self.conversation_history = []
+        self.chat_lines = []
+        self._cancel_reply()
+        # A new visitor: the model forgets the previous conversation too (the history is set before each message)
+        self.chat_context.reset()
+        self._add_message("Wizard", "Greetings, friend! Welcome to my humble abode. What brings you here today?")
         return True
     
     def end_conversation(self):
         """End the current conversation"""
+        self._cancel_reply()
         self.is_active = False
         self.input_active = False
         self.current_input = ""
@@ -94,10 +103,15 @@ class WizardChatManager:
         
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
-                self.end_conversation()
+                if self.is_waiting_for_reply:
+                    # First ESC only stops the reply, a second one ends the conversation
+                    self._cancel_reply(show_note=True)
+                else:
+                    self.end_conversation()
                 return True
             elif event.key == pygame.K_RETURN:
-                if self.current_input.strip():
+                # One message at a time: the chat session can't take a new message while a reply is still streaming
+                if self.current_input.strip() and not self._is_worker_busy():
                     self._send_message(self.current_input.strip())
                     self.current_input = ""
                 return True
@@ -108,7 +122,7 @@ class WizardChatManager:
                 self.scroll_offset = max(0, self.scroll_offset - 1)
                 return True
             elif event.key == pygame.K_DOWN:
-                max_scroll = max(0, len(self._get_wrapped_history()) - self._get_visible_lines())
+                max_scroll = max(0, len(self.chat_lines) - self.visible_lines)
                 self.scroll_offset = min(max_scroll, self.scroll_offset + 1)
                 return True
             else:
@@ -120,50 +134,119 @@ class WizardChatManager:
         return False
     
     def _send_message(self, message):
-        """Send a message to the wizard and get response"""
+        """Send a message to the wizard, the reply streams in on a background thread"""
         # Add player message to history
-        self.conversation_history.append(("You", message)) 
-        
-        # Send to API and get response
+        self._add_message("You", message)
+        self._scroll_to_bottom()
+
+        self.is_waiting_for_reply = True
+        self._streaming_line_start = None
+        self.reply_worker = threading.Thread(target=self._stream_reply,
+                                             args=(message, self.reply_generation, self.chat_context.generation), daemon=True)
+        self.reply_worker.start()
+
+    def _stream_reply(self, message, generation, context_generation):
+        """Worker thread: sends the message in streaming mode and queues each chunk of text"""
+        def generate_chunks():
+            for chunk in self.chat_session.send_message(message, stream=True):
+                yield chunk.text
+
         try:
-            response = self.chat_session.send_message(message)
-            wizard_response = response.text
-            print(f"Wizard response: {repr(wizard_response)}") 
-            self.conversation_history.append(("Wizard", wizard_response))
-            
-            # Auto-scroll to bottom
-            self._scroll_to_bottom()
-            
+            # The session only gets the bounded context, so each turn costs about the same however long the chat is
+            history = self.chat_context.build_history()
+            self.chat_session.history = history
+            contents = history_to_contents(history) + [("user", message)]
+            reply_chunks = []
+            # Keep reading even after a cancel, so the whole turn makes it into the context
+            for text in llm_cache.stream(WIZARD_MODEL_NAME, WIZARD_SYSTEM_INSTRUCTION, contents, generate_chunks):
+                reply_chunks.append(text)
+                self.reply_queue.put((generation, "chunk", text))
+            self.chat_context.add_turn(message, "".join(reply_chunks), context_generation)
+            self.reply_queue.put((generation, "done", None))
+        except GuardRejectedError:
+            self.reply_queue.put((generation, "error", "The wizard closes his eyes to rest his mind. Ask him again in a little while."))
         except Exception as e:
             error_msg = f"The wizard seems distracted... (Error: {str(e)})"
-            self.conversation_history.append(("Wizard", error_msg))
-    
-    def _get_wrapped_history(self):
-        """Get conversation history with text wrapping applied"""
-        wrapped_lines = []
-        for speaker, message in self.conversation_history:
-            # Wrap the message
-            wrapped_message = textwrap.fill(message, width=self.wrap_width)
-            lines = wrapped_message.split('\n')
-            
-            for i, line in enumerate(lines):
-                if i == 0:
-                    wrapped_lines.append(f"{speaker}: {line}")
-                else:
-                    wrapped_lines.append(f"{''.ljust(len(speaker) + 2)}{line}")
-            wrapped_lines.append("")  # Empty line between messages
-        
-        return wrapped_lines
+            self.reply_queue.put((generation, "error", error_msg))
+
+    def _is_worker_busy(self):
+        return self.reply_worker is not None and self.reply_worker.is_alive()
+
+    def _cancel_reply(self, show_note=False):
+        """Stops showing the current reply. Its remaining chunks are dropped when they arrive."""
+        if not self.is_waiting_for_reply:
+            return
+        self.reply_generation += 1
+        self.is_waiting_for_reply = False
+        self._streaming_line_start = None
+        if show_note:
+            self._add_message("Wizard", "(The wizard falls silent.)")
+            self._scroll_to_bottom()
+
+    def update(self):
+        """Applies streamed reply chunks that arrived since the last frame (call once per frame)"""
+        while True:
+            try:
+                generation, kind, text = self.reply_queue.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.reply_generation:
+                continue  # Chunk of a cancelled reply
+
+            if kind == "chunk":
+                self._append_to_reply(text)
+            elif kind == "error":
+                self._add_message("Wizard", text)
+                self._finish_reply()
+            else:
+                if self._streaming_line_start is not None:
+                    print(f"Wizard response: {repr(self.conversation_history[-1][1])}")
+                self._finish_reply()
+
+    def _append_to_reply(self, text):
+        """Adds streamed text to the wizard's reply, re-rendering only that message's lines"""
+        at_bottom = self.scroll_offset >= len(self.chat_lines) - self.visible_lines
+        if self._streaming_line_start is None:
+            self._streaming_line_start = len(self.chat_lines)
+            self._add_message("Wizard", text)
+        else:
+            speaker, reply_so_far = self.conversation_history[-1]
+            self.conversation_history[-1] = (speaker, reply_so_far + text)
+            del self.chat_lines[self._streaming_line_start:]
+            self.chat_lines.extend(self._render_message_lines(speaker, reply_so_far + text))
+        if at_bottom:
+            # Auto-scroll to bottom unless the player scrolled up to read
+            self._scroll_to_bottom()
+
+    def _finish_reply(self):
+        self.is_waiting_for_reply = False
+        self._streaming_line_start = None
+        self._scroll_to_bottom()
     
-    def _get_visible_lines(self):
-        """Calculate how many lines can fit in the chat area"""
-        return (self.chat_height - self.input_height - 40) // (self.font.get_height() + 2)
+    def _add_message(self, speaker, message):
+        """Adds a message to the history and appends its wrapped, pre-rendered lines to the chat log"""
+        self.conversation_history.append((speaker, message))
+        self.chat_lines.extend(self._render_message_lines(speaker, message))
+
+    def _render_message_lines(self, speaker, message):
+        speaker_color = self.player_text_color if speaker == "You" else self.wizard_text_color
+        rendered_lines = []
+        for i, line in enumerate(wrap_chars(message, self.wrap_width)):
+            if i == 0:
+                # Speaker label in its own colour, followed by the message text
+                speaker_surface = self.font.render(f"{speaker}:", True, speaker_color)
+                message_surface = self.font.render(f" {line}", True, self.text_color)
+                rendered_lines.append([(speaker_surface, 0), (message_surface, speaker_surface.get_width())])
+            else:
+                # Continuation lines are indented to line up after the speaker label
+                text_surface = self.font.render(f"{''.ljust(len(speaker) + 2)}{line}", True, self.text_color)
+                rendered_lines.append([(text_surface, 0)])
+        rendered_lines.append(None)  # Empty line between messages
+        return rendered_lines
     
     def _scroll_to_bottom(self):
         """Scroll to the bottom of the conversation"""
-        wrapped_lines = self._get_wrapped_history()
-        visible_lines = self._get_visible_lines()
-        self.scroll_offset = max(0, len(wrapped_lines) - visible_lines)
+        self.scroll_offset = max(0, len(self.chat_lines) - self.visible_lines)
     
     def draw(self, screen):
         """Draw the chat interface"""
@@ -191,40 +274,19 @@ class WizardChatManager:
         screen.blit(chat_surface, (self.chat_x, self.chat_y))
     
     def _draw_conversation(self, surface):
-        """Draw the conversation history"""
-        wrapped_lines = self._get_wrapped_history()
-        visible_lines = self._get_visible_lines()
-        
+        """Draw the visible window of the pre-rendered conversation"""
         y_offset = 25  # Changed from 10 to 25 for more top padding
-        line_height = self.font.get_height() + 2
         left_margin = 15  # Changed from 10 to 15 for more left padding
         
         # Determine which lines to show based on scroll
         start_line = self.scroll_offset
-        end_line = min(len(wrapped_lines), start_line + visible_lines)
+        end_line = min(len(self.chat_lines), start_line + self.visible_lines)
         
-        for i in range(start_line, end_line):
-            line = wrapped_lines[i]
-            if line.strip():  # Don't render empty lines
-                # Split speaker from message for separate coloring
-                if line.startswith("You:"):
-                    speaker_surface = self.font.render("You:", True, self.player_text_color)
-                    message_text = line[4:]  # Remove "You:"
-                    message_surface = self.font.render(message_text, True, self.text_color)
-                    surface.blit(speaker_surface, (left_margin, y_offset))
-                    surface.blit(message_surface, (left_margin + speaker_surface.get_width(), y_offset))
-                elif line.startswith("Wizard:"):
-                    speaker_surface = self.font.render("Wizard:", True, self.wizard_text_color)
-                    message_text = line[7:]  # Remove "Wizard:"
-                    message_surface = self.font.render(message_text, True, self.text_color)
-                    surface.blit(speaker_surface, (left_margin, y_offset))
-                    surface.blit(message_surface, (left_margin + speaker_surface.get_width(), y_offset))
-                else:
-                    # Continuation lines (no speaker prefix)
-                    text_surface = self.font.render(line, True, self.text_color)
-                    surface.blit(text_surface, (left_margin, y_offset))
-            
-            y_offset += line_height
+        for line_pieces in self.chat_lines[start_line:end_line]:
+            if line_pieces:  # Empty lines are None
+                for piece_surface, piece_x in line_pieces:
+                    surface.blit(piece_surface, (left_margin + piece_x, y_offset))
+            y_offset += self.line_height
     
     def _draw_input_area(self, surface):
         """Draw the input area"""
@@ -243,17 +305,23 @@ class WizardChatManager:
         
         text_surface = self.input_font.render(display_text, True, self.text_color)
         surface.blit(text_surface, (input_rect.x + 5, input_rect.y + 10))
+
+        # Typing indicator while the wizard's reply is on its way
+        if self.is_waiting_for_reply:
+            dots = "." * (1 + pygame.time.get_ticks() // 400 % 3)
+            indicator_surface = render_text(f"The wizard is writing{dots}", 24, self.wizard_text_color)
+            surface.blit(indicator_surface, (input_rect.x + 5, input_rect.y - indicator_surface.get_height() - 4))
     
     def _draw_instructions(self, surface):
         """Draw instruction text"""
         instructions = [
             "Press ENTER to send message",
-            "Press ESC to end conversation",
+            "Press ESC to stop reply / end chat",
             "Use UP/DOWN arrows to scroll"
         ]
         
         y_offset = self.chat_height - 43
         for instruction in instructions:
-            text_surface = pygame.font.Font(None, 20).render(instruction, True, (150, 150, 150))
+            text_surface = render_text(instruction, 20, (150, 150, 150))
             surface.blit(text_surface, (1350, y_offset))
             y_offset += 13
\ No newline at end of file
@@ -1,4 +1,5 @@
 import pygame
+from tile_layer import TileLayer
 
 # Constants for the Wizard's House map
 TILE_ORIG_SIZE = 32 # Original size of tiles in InteriorTiles.png
@@ -10,7 +11,7 @@ EMPTY_TILE_ID = -1
 # Tile IDs are placeholders; adjust them to match your 'cloud_tileset.png'
 # 100: Wall tile, 41: Floor tile, 150: Door/Exit tile
 # Table: 200-202 (top row), 245-247 (bottom row)
-HOUSE_MAP = [
+HOUSE_MAP = TileLayer.from_rows([
     [1 , 2 , 2 , 2 , 2 , 2 , 2 , 2 , 2 , 2 , 6 , -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1], #25 wide
     [17, 18, 19, 19, 19, 19, 19, 19, 19, 20, 22, -1, 1 , 2 , 2 , 2 , 2 , 2 , 2 , 2 , 2 , 2 , 2 , 6 , -1, -1],
     [17, 34, 35, 35, 35, 35, 35, 35, 35, 36, 22, -1 , 17, 18, 19, 19, 19, 19, 19, 19, 19, 19, 20, 22],
@@ -26,9 +27,9 @@ HOUSE_MAP = [
     [-1],
     [-1]
 
-]
+], fill_value=EMPTY_TILE_ID)
 
-HOUSE_BUILDING_MAP = [
+HOUSE_BUILDING_MAP = TileLayer.from_rows([
     [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
     [-1, -1, -1, 57, -1, -1, -1, -1, -1, -1],
     [-1, -1, -1, 73, -1, 140,141,-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
@@ -42,9 +43,9 @@ HOUSE_BUILDING_MAP = [
     [-1, 180,-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
     [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1]
 
-]
+], fill_value=EMPTY_TILE_ID)
 
-HOUSE_COLLISION_MAP = [
+HOUSE_COLLISION_MAP = TileLayer.from_rows([
     [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
     [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
     [1, 0, 0, 0, 0, 1, 1, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
@@ -57,13 +58,13 @@ HOUSE_COLLISION_MAP = [
     [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
     [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
     [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
-]
+], fill_value=1)  # Missing tiles are walls
 
 # New decoration layer
 # Dimensions should match HOUSE_MAP
 # Use EMPTY_TILE_ID for no decoration, and other tile IDs from InteriorTiles.png for decorations
 # These are placeholder IDs, update them with actual IDs from InteriorTiles.png
-HOUSE_DECORATION_MAP = [
+HOUSE_DECORATION_MAP = TileLayer.from_rows([
     [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
     [-1, 80, 80, -1, -1, -1, -1, -1, -1, -1], 
     [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
@@ -72,7 +73,7 @@ HOUSE_DECORATION_MAP = [
     [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
     [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
     [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1]
-]
+], fill_value=EMPTY_TILE_ID)
 
 PLAYER_START_X_TILE = 4
 PLAYER_START_Y_TILE = 5